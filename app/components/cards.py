@@ -1,192 +1,312 @@
+import string
+from functools import lru_cache
+
 import streamlit as st
 
-def privacy_detection_card(detection_settings):
-    """Create the privacy detection settings card"""
-    
-    st.markdown("""
-    <div style="background: #1f2937; border-radius: 12px; padding: 1.5rem; border: 1px solid #374151;">
-        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1.5rem;">
-            <h3 style="margin: 0; color: white; font-size: 1.2rem;">Privacy Detection</h3>
-            <span style="background: linear-gradient(135deg, #8b5cf6 0%, #a855f7 100%); color: white; padding: 0.25rem 0.75rem; border-radius: 6px; font-size: 0.75rem; font-weight: 600;">AI-Powered</span>
+# All card styling lives in one stylesheet injected once per session.
+# Shipping the rules as CSS classes instead of repeated inline style=""
+# attributes shrinks the HTML payload of every card on every rerun.
+
+_APP_CSS = """
+<style>
+.ss-card { background: #1f2937; border-radius: 12px; padding: 1.5rem; border: 1px solid #374151; }
+.ss-card--feed { margin-bottom: 1.5rem; }
+.ss-card--stats { margin-bottom: 1rem; }
+.ss-card-header { display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem; }
+.ss-card-header--roomy { margin-bottom: 1.5rem; }
+.ss-card-title { margin: 0; color: white; }
+.ss-card-title--sm { font-size: 1.1rem; }
+.ss-card-title--md { font-size: 1.2rem; }
+.ss-badge-ai { background: linear-gradient(135deg, #8b5cf6 0%, #a855f7 100%); color: white; padding: 0.25rem 0.75rem; border-radius: 6px; font-size: 0.75rem; font-weight: 600; }
+.ss-status-badge { padding: 0.25rem 0.75rem; border-radius: 6px; font-size: 0.75rem; text-transform: uppercase; font-weight: 600; }
+.ss-status-badge--on { background: #10b981; color: #ffffff; }
+.ss-status-badge--off { background: #374151; color: #9ca3af; }
+.ss-option-row { display: flex; align-items: center; gap: 1rem; padding: 1rem 0; }
+.ss-option-icon { font-size: 1.2rem; color: #8b5cf6; }
+.ss-option-title { margin: 0; color: white; font-size: 1rem; }
+.ss-option-desc { margin: 0.25rem 0 0 0; color: #9ca3af; font-size: 0.85rem; }
+.ss-footer-note { text-align: center; color: #6b7280; margin-top: 1.5rem; font-size: 0.85rem; }
+.ss-inline-status { text-align: center; margin-top: 1rem; font-size: 0.9rem; }
+.ss-placeholder { display: flex; flex-direction: column; align-items: center; justify-content: center; height: 300px; background: #111827; border: 2px dashed #374151; border-radius: 8px; color: #9ca3af; }
+.ss-placeholder-icon { font-size: 3rem; color: #6b7280; margin-bottom: 1rem; }
+.ss-stat-grid { display: grid; grid-template-columns: 1fr; gap: 1rem; }
+.ss-stat-row { display: flex; justify-content: space-between; align-items: center; padding: 0.5rem 0; border-bottom: 1px solid #374151; }
+.ss-stat-row--last { border-bottom: none; }
+.ss-stat-label { color: #9ca3af; }
+.ss-stat-value { color: white; font-weight: 600; }
+</style>
+"""
+
+def _inject_css():
+    """Inject the shared card stylesheet
+
+    Emitted on every run: Streamlit drops any element that is not
+    re-emitted during a script run, so gating this on session state
+    would strip the card styling after the first rerun. The string is a
+    module constant, so the call costs one markdown message.
+    """
+    st.markdown(_APP_CSS, unsafe_allow_html=True)
+
+_PRIVACY_HEADER_HTML = """
+<div class="ss-card">
+    <div class="ss-card-header ss-card-header--roomy">
+        <h3 class="ss-card-title ss-card-title--md">Privacy Detection</h3>
+        <span class="ss-badge-ai">AI-Powered</span>
+    </div>
+</div>
+"""
+
+_PRIVACY_FOOTER_HTML = """
+<div class="ss-footer-note">
+    Detection settings can be adjusted during live streaming
+</div>
+"""
+
+_OPTION_ROW_HTML = """
+<div class="ss-option-row">
+    <span class="ss-option-icon">{icon}</span>
+    <div>
+        <h4 class="ss-option-title">{title}</h4>
+        <p class="ss-option-desc">{description}</p>
+    </div>
+</div>
+"""
+
+# Static option schema for the privacy detection card. Only the boolean
+# `enabled` state varies per rerun, so the rows are rendered once here.
+_DETECTION_OPTIONS = (
+    {
+        'key': 'license_plates',
+        'icon': '🚗',
+        'title': 'License Plates',
+        'description': 'Hide vehicle license plates',
+        'default': True
+    },
+    {
+        'key': 'street_signs',
+        'icon': '📍',
+        'title': 'Street Signs',
+        'description': 'Blur street name signs',
+        'default': True
+    },
+    {
+        'key': 'block_numbers',
+        'icon': '🏠',
+        'title': 'Block Numbers',
+        'description': 'Hide building numbers',
+        'default': False
+    }
+)
+
+_OPTION_ROWS_HTML = {
+    option['key']: _OPTION_ROW_HTML.format_map(option)
+    for option in _DETECTION_OPTIONS
+}
+
+_CONTROLS_HEADER_HTML = """
+<div class="ss-card">
+    <h3 style="margin: 0 0 1rem 0; color: white;">Stream Controls</h3>
+</div>
+"""
+
+# Templates are compiled once here; string.Template substitution is a
+# single regex pass, cheaper than re-parsing an f-string per rerun.
+_WEBCAM_STATUS_TMPL = string.Template("""
+<div class="ss-inline-status" style="color: ${status_color};">
+    ${status_text}
+</div>
+""")
+
+_FEED_HEADER_TMPL = string.Template("""
+<div class="ss-card ss-card--feed">
+    <div class="ss-card-header">
+        <h3 class="ss-card-title">${title}</h3>
+        <span class="ss-status-badge ss-status-badge--${status_mod}">${status_text}</span>
+    </div>
+""")
+
+_FEED_PLACEHOLDER_TMPL = string.Template("""
+<div class="ss-placeholder">
+    <div class="ss-placeholder-icon">▶</div>
+    <div>${placeholder_text}</div>
+</div>
+""")
+
+_STATS_TMPL = string.Template("""
+<div class="ss-card ss-card--stats">
+    <h3 class="ss-card-title ss-card-title--sm" style="margin-bottom: 1rem;">📊 Stream Stats</h3>
+
+    <div class="ss-stat-grid">
+        <div class="ss-stat-row">
+            <span class="ss-stat-label">Status</span>
+            <span style="color: ${status_color}; font-weight: 600;">${status_text}</span>
+        </div>
+
+        <div class="ss-stat-row">
+            <span class="ss-stat-label">FPS</span>
+            <span class="ss-stat-value">${fps}</span>
+        </div>
+
+        <div class="ss-stat-row">
+            <span class="ss-stat-label">Latency</span>
+            <span class="ss-stat-value">${latency}ms</span>
+        </div>
+
+        <div class="ss-stat-row ss-stat-row--last">
+            <span class="ss-stat-label">Detections</span>
+            <span class="ss-stat-value">${detections}</span>
         </div>
     </div>
-    """, unsafe_allow_html=True)
-    
-    # Detection options
-    options = [
-        {
-            'key': 'license_plates',
-            'icon': '🚗',
-            'title': 'License Plates',
-            'description': 'Hide vehicle license plates',
-            'enabled': detection_settings.get('license_plates', True)
-        },
-        {
-            'key': 'street_signs', 
-            'icon': '📍',
-            'title': 'Street Signs',
-            'description': 'Blur street name signs',
-            'enabled': detection_settings.get('street_signs', True)
-        },
-        {
-            'key': 'block_numbers',
-            'icon': '🏠', 
-            'title': 'Block Numbers',
-            'description': 'Hide building numbers',
-            'enabled': detection_settings.get('block_numbers', False)
-        }
-    ]
-    
+</div>
+""")
+
+_SETTINGS_HEADER_HTML = """
+<div class="ss-card">
+    <h3 class="ss-card-title ss-card-title--sm" style="margin-bottom: 1rem;">🔧 Quick Settings</h3>
+</div>
+"""
+
+@st.fragment
+def privacy_detection_card(detection_settings):
+    """Create the privacy detection settings card
+
+    Runs as a fragment so toggling a detection option reruns only this
+    card instead of the whole script. The latest settings are mirrored to
+    ``st.session_state['privacy_settings']`` for callers, since fragment
+    reruns do not re-execute the caller's assignment.
+    """
+
+    _inject_css()
+    st.markdown(_PRIVACY_HEADER_HTML, unsafe_allow_html=True)
+
     updated_settings = {}
-    
-    for option in options:
+
+    for option in _DETECTION_OPTIONS:
         col1, col2 = st.columns([4, 1])
-        
+
         with col1:
-            st.markdown(f"""
-            <div style="display: flex; align-items: center; gap: 1rem; padding: 1rem 0;">
-                <span style="font-size: 1.2rem; color: #8b5cf6;">{option['icon']}</span>
-                <div>
-                    <h4 style="margin: 0; color: white; font-size: 1rem;">{option['title']}</h4>
-                    <p style="margin: 0.25rem 0 0 0; color: #9ca3af; font-size: 0.85rem;">{option['description']}</p>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        
+            st.markdown(_OPTION_ROWS_HTML[option['key']], unsafe_allow_html=True)
+
         with col2:
             updated_settings[option['key']] = st.toggle(
                 "",
-                value=option['enabled'],
+                value=detection_settings.get(option['key'], option['default']),
                 key=f"detection_{option['key']}",
                 label_visibility="collapsed"
             )
-    
-    st.markdown("""
-    <div style="text-align: center; color: #6b7280; margin-top: 1.5rem; font-size: 0.85rem;">
-        Detection settings can be adjusted during live streaming
-    </div>
-    """, unsafe_allow_html=True)
-    
+
+    st.markdown(_PRIVACY_FOOTER_HTML, unsafe_allow_html=True)
+
+    st.session_state['privacy_settings'] = updated_settings
     return updated_settings
 
+@st.fragment
 def stream_controls_card(is_streaming=False, webcam_active=False):
     """Create the stream controls card"""
-    
-    st.markdown("""
-    <div style="background: #1f2937; border-radius: 12px; padding: 1.5rem; border: 1px solid #374151;">
-        <h3 style="margin: 0 0 1rem 0; color: white;">Stream Controls</h3>
-    </div>
-    """, unsafe_allow_html=True)
-    
+
+    _inject_css()
+    st.markdown(_CONTROLS_HEADER_HTML, unsafe_allow_html=True)
+
     # Control buttons
     col1, col2 = st.columns([4, 1])
-    
+
     with col1:
         if is_streaming:
             stream_button = st.button(
-                "⏹️ Stop Stream", 
+                "⏹️ Stop Stream",
                 key="stop_stream",
                 type="primary",
                 use_container_width=True
             )
         else:
             stream_button = st.button(
-                "🎬 Start Stream", 
+                "🎬 Start Stream",
                 key="start_stream",
-                type="primary", 
+                type="primary",
                 use_container_width=True
             )
-    
+
     with col2:
         external_button = st.button(
             "🔗 External",
             key="external_stream",
             use_container_width=True
         )
-    
+
     # Webcam status
-    status_text = "📹 Webcam Active" if webcam_active else "📹 Webcam Inactive"
-    status_color = "#10b981" if webcam_active else "#9ca3af"
-    
-    st.markdown(f"""
-    <div style="text-align: center; color: {status_color}; margin-top: 1rem; font-size: 0.9rem;">
-        {status_text}
-    </div>
-    """, unsafe_allow_html=True)
-    
-    return {
+    st.markdown(
+        _WEBCAM_STATUS_TMPL.substitute(
+            status_text="📹 Webcam Active" if webcam_active else "📹 Webcam Inactive",
+            status_color="#10b981" if webcam_active else "#9ca3af"
+        ),
+        unsafe_allow_html=True
+    )
+
+    result = {
         'stream_button_clicked': stream_button,
         'external_button_clicked': external_button,
         'is_streaming': is_streaming
     }
+    st.session_state['stream_controls'] = result
+    return result
+
+# The HTML builders are pure functions of their arguments, so repeated
+# renders of the same snapshot (common during rapid polling) become a
+# dict lookup instead of template substitution.
+
+@lru_cache(maxsize=256)
+def _build_feed_html(title: str, is_online: bool, placeholder_text: str) -> str:
+    """Build the video feed card HTML for a given state"""
+    # One st.markdown per card: each call is a separate render message to
+    # the frontend, so the header, placeholder and closing tag are joined
+    # into a single payload.
+    html = _FEED_HEADER_TMPL.substitute(
+        title=title,
+        status_mod="on" if is_online else "off",
+        status_text="Online" if is_online else "Offline"
+    )
+
+    if not is_online:
+        html += _FEED_PLACEHOLDER_TMPL.substitute(placeholder_text=placeholder_text)
+
+    return html + "</div>"
 
 def video_feed_card(title, is_online=False, placeholder_text="Click \"Start Stream\" to begin"):
     """Create a video feed display card"""
-    
-    status_badge = "online-badge" if is_online else "offline-badge" 
-    status_text = "Online" if is_online else "Offline"
-    
-    st.markdown(f"""
-    <div style="background: #1f2937; border-radius: 12px; padding: 1.5rem; margin-bottom: 1.5rem; border: 1px solid #374151;">
-        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;">
-            <h3 style="margin: 0; color: white;">{title}</h3>
-            <span class="{status_badge}" style="background: {'#10b981' if is_online else '#374151'}; color: {'#ffffff' if is_online else '#9ca3af'}; padding: 0.25rem 0.75rem; border-radius: 6px; font-size: 0.75rem; text-transform: uppercase; font-weight: 600;">{status_text}</span>
-        </div>
-    """, unsafe_allow_html=True)
-    
-    if not is_online:
-        st.markdown(f"""
-        <div style="display: flex; flex-direction: column; align-items: center; justify-content: center; height: 300px; background: #111827; border: 2px dashed #374151; border-radius: 8px; color: #9ca3af;">
-            <div style="font-size: 3rem; color: #6b7280; margin-bottom: 1rem;">▶</div>
-            <div>{placeholder_text}</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    st.markdown("</div>", unsafe_allow_html=True)
 
+    _inject_css()
+    st.markdown(_build_feed_html(title, is_online, placeholder_text), unsafe_allow_html=True)
+
+@lru_cache(maxsize=256)
+def _build_stats_html(fps: float, latency: float, detections: int, is_live: bool) -> str:
+    """Build the stats card HTML for a bucketed metrics snapshot"""
+    return _STATS_TMPL.substitute(
+        status_color="#10b981" if is_live else "#6b7280",
+        status_text="🟢 Live" if is_live else "⚫ Offline",
+        fps=f"{fps:.1f}",
+        latency=f"{latency:.0f}",
+        detections=detections
+    )
+
+@st.fragment
 def stats_card(fps=0.0, latency=0, detections=0, is_live=False):
     """Create a stats display card"""
-    
-    status_color = "#10b981" if is_live else "#6b7280"
-    status_text = "🟢 Live" if is_live else "⚫ Offline"
-    
-    st.markdown(f"""
-    <div style="background: #1f2937; border-radius: 12px; padding: 1.5rem; border: 1px solid #374151; margin-bottom: 1rem;">
-        <h3 style="margin: 0 0 1rem 0; color: white; font-size: 1.1rem;">📊 Stream Stats</h3>
-        
-        <div style="display: grid; grid-template-columns: 1fr; gap: 1rem;">
-            <div style="display: flex; justify-content: space-between; align-items: center; padding: 0.5rem 0; border-bottom: 1px solid #374151;">
-                <span style="color: #9ca3af;">Status</span>
-                <span style="color: {status_color}; font-weight: 600;">{status_text}</span>
-            </div>
-            
-            <div style="display: flex; justify-content: space-between; align-items: center; padding: 0.5rem 0; border-bottom: 1px solid #374151;">
-                <span style="color: #9ca3af;">FPS</span>
-                <span style="color: white; font-weight: 600;">{fps:.1f}</span>
-            </div>
-            
-            <div style="display: flex; justify-content: space-between; align-items: center; padding: 0.5rem 0; border-bottom: 1px solid #374151;">
-                <span style="color: #9ca3af;">Latency</span>
-                <span style="color: white; font-weight: 600;">{latency:.0f}ms</span>
-            </div>
-            
-            <div style="display: flex; justify-content: space-between; align-items: center; padding: 0.5rem 0;">
-                <span style="color: #9ca3af;">Detections</span>
-                <span style="color: white; font-weight: 600;">{detections}</span>
-            </div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
 
+    _inject_css()
+    # Bucket the floats to the displayed precision so near-identical
+    # snapshots hit the same cache entry
+    st.markdown(
+        _build_stats_html(round(fps, 1), round(latency), detections, is_live),
+        unsafe_allow_html=True
+    )
+
+@st.fragment
 def settings_card():
     """Create a settings configuration card"""
-    
-    st.markdown("""
-    <div style="background: #1f2937; border-radius: 12px; padding: 1.5rem; border: 1px solid #374151;">
-        <h3 style="margin: 0 0 1rem 0; color: white; font-size: 1.1rem;">🔧 Quick Settings</h3>
-    </div>
-    """, unsafe_allow_html=True)
-    
+
+    _inject_css()
+    st.markdown(_SETTINGS_HEADER_HTML, unsafe_allow_html=True)
+
     # Settings options
     quality = st.selectbox(
         "Stream Quality",
@@ -194,30 +314,32 @@ def settings_card():
         index=0,
         key="stream_quality"
     )
-    
+
     bitrate = st.slider(
         "Bitrate (Mbps)",
         min_value=1,
-        max_value=10, 
+        max_value=10,
         value=5,
         key="stream_bitrate"
     )
-    
+
     enable_audio = st.checkbox(
         "Enable Audio",
         value=False,
         key="enable_audio"
     )
-    
+
     reset_clicked = st.button(
         "Reset Settings",
         key="reset_settings",
         use_container_width=True
     )
-    
-    return {
+
+    result = {
         'quality': quality,
         'bitrate': bitrate,
         'enable_audio': enable_audio,
         'reset_clicked': reset_clicked
-    }
\ No newline at end of file
+    }
+    st.session_state['stream_settings'] = result
+    return result
@@ -1,53 +1,53 @@
+import string
+
 import streamlit as st
 
+# Panel chrome is identical for both feeds; compiled once at import so a
+# rerun only pays for one substitute() and one st.markdown per panel.
+_PANEL_HEADER_TMPL = string.Template("""
+<div style="background: #1f2937; border-radius: 12px; padding: 1.5rem; margin-bottom: 1.5rem; border: 1px solid #374151;">
+    <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;">
+        <h3 style="margin: 0; color: white;">${title}</h3>
+        <span style="background: ${badge_bg}; color: ${badge_fg}; padding: 0.25rem 0.75rem; border-radius: 6px; font-size: 0.75rem; text-transform: uppercase; font-weight: 600;">${status_text}</span>
+    </div>
+""")
+
+_PLACEHOLDER_TMPL = string.Template("""
+<div style="display: flex; flex-direction: column; align-items: center; justify-content: center; height: 300px; background: #111827; border: 2px dashed #374151; border-radius: 8px; color: #9ca3af;">
+    <div style="font-size: 3rem; color: #6b7280; margin-bottom: 1rem;">▶</div>
+    <div>${placeholder_text}</div>
+</div>
+</div>
+""")
+
+_ORIGINAL_PLACEHOLDER_HTML = _PLACEHOLDER_TMPL.substitute(placeholder_text='Click "Start Stream" to begin')
+_PROCESSED_PLACEHOLDER_HTML = _PLACEHOLDER_TMPL.substitute(placeholder_text='Processed feed will appear here')
+
+def _render_panel(title, content, online, placeholder_html):
+    """Render one split-view panel with a single markdown call when possible"""
+    header = _PANEL_HEADER_TMPL.substitute(
+        title=title,
+        badge_bg='#10b981' if online else '#374151',
+        badge_fg='#ffffff' if online else '#9ca3af',
+        status_text='Online' if online else 'Offline'
+    )
+    if content:
+        st.markdown(header, unsafe_allow_html=True)
+        st.write(content)
+        st.markdown("</div>", unsafe_allow_html=True)
+    else:
+        st.markdown(header + placeholder_html, unsafe_allow_html=True)
+
 def create_split_view(original_content=None, processed_content=None, original_online=False, processed_online=False):
     """Create a split view layout for original and processed video feeds"""
     
     col1, col2 = st.columns([1, 1])
-    
+
     with col1:
-        # Original Feed
-        st.markdown(f"""
-        <div style="background: #1f2937; border-radius: 12px; padding: 1.5rem; margin-bottom: 1.5rem; border: 1px solid #374151;">
-            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;">
-                <h3 style="margin: 0; color: white;">Original Feed</h3>
-                <span style="background: {'#10b981' if original_online else '#374151'}; color: {'#ffffff' if original_online else '#9ca3af'}; padding: 0.25rem 0.75rem; border-radius: 6px; font-size: 0.75rem; text-transform: uppercase; font-weight: 600;">{'Online' if original_online else 'Offline'}</span>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        if original_content:
-            st.write(original_content)
-        else:
-            st.markdown("""
-            <div style="display: flex; flex-direction: column; align-items: center; justify-content: center; height: 300px; background: #111827; border: 2px dashed #374151; border-radius: 8px; color: #9ca3af;">
-                <div style="font-size: 3rem; color: #6b7280; margin-bottom: 1rem;">▶</div>
-                <div>Click "Start Stream" to begin</div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        st.markdown("</div>", unsafe_allow_html=True)
-    
+        _render_panel("Original Feed", original_content, original_online, _ORIGINAL_PLACEHOLDER_HTML)
+
     with col2:
-        # Privacy Protected Feed
-        st.markdown(f"""
-        <div style="background: #1f2937; border-radius: 12px; padding: 1.5rem; margin-bottom: 1.5rem; border: 1px solid #374151;">
-            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;">
-                <h3 style="margin: 0; color: white;">Privacy Protected</h3>
-                <span style="background: {'#10b981' if processed_online else '#374151'}; color: {'#ffffff' if processed_online else '#9ca3af'}; padding: 0.25rem 0.75rem; border-radius: 6px; font-size: 0.75rem; text-transform: uppercase; font-weight: 600;">{'Online' if processed_online else 'Offline'}</span>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        if processed_content:
-            st.write(processed_content)
-        else:
-            st.markdown("""
-            <div style="display: flex; flex-direction: column; align-items: center; justify-content: center; height: 300px; background: #111827; border: 2px dashed #374151; border-radius: 8px; color: #9ca3af;">
-                <div style="font-size: 3rem; color: #6b7280; margin-bottom: 1rem;">▶</div>
-                <div>Processed feed will appear here</div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        st.markdown("</div>", unsafe_allow_html=True)
+        _render_panel("Privacy Protected", processed_content, processed_online, _PROCESSED_PLACEHOLDER_HTML)
 
 def create_comparison_view(original_frame, processed_frame, show_diff=False):
     """Create a comparison view with optional difference highlighting"""
@@ -125,12 +125,11 @@ def create_sidebar_layout():
 
 def create_floating_controls(is_streaming=False):
     """Create floating action controls"""
-    
-    st.markdown("""
-    <div style="position: fixed; bottom: 2rem; right: 2rem; z-index: 1000;">
-        <div style="display: flex; flex-direction: column; gap: 1rem;">
-    """, unsafe_allow_html=True)
-    
+
+    # Streamlit renders buttons through its own element tree, so the old
+    # fixed-position wrapper divs never actually contained them; the two
+    # st.markdown calls were dead weight on every rerun.
+
     # Floating start/stop button
     if is_streaming:
         if st.button("⏹️", key="floating_stop", help="Stop Stream"):
@@ -138,14 +137,9 @@ def create_floating_controls(is_streaming=False):
     else:
         if st.button("🎬", key="floating_start", help="Start Stream"):
             return "start_stream"
-    
+
     # Floating settings button
     if st.button("⚙️", key="floating_settings", help="Settings"):
         return "settings"
-    
-    st.markdown("""
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-    
+
     return None
\ No newline at end of file
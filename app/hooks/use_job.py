@@ -1,10 +1,23 @@
+import itertools
+import os
 import time
-import uuid
+from functools import partial
+from collections import deque
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable, Set
 import streamlit as st
 
+# Job ids only need to be unique within this process (they are dict keys in
+# JobQueue), so a monotonic counter is much cheaper than uuid4. The pid
+# prefix keeps ids distinguishable across processes.
+_id_counter = itertools.count(1)
+_pid = os.getpid()
+
+def _next_id() -> str:
+    """Generate the next process-local job id"""
+    return f"{_pid}-{next(_id_counter)}"
+
 class JobStatus(Enum):
     PENDING = "pending"
     RUNNING = "running" 
@@ -12,6 +25,8 @@ class JobStatus(Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
 
+TERMINAL_STATES = frozenset({JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED})
+
 class JobType(Enum):
     VIDEO_UPLOAD = "video_upload"
     VIDEO_PROCESSING = "video_processing"
@@ -19,10 +34,16 @@ class JobType(Enum):
     MODEL_TRAINING = "model_training"
     EXPORT = "export"
 
-@dataclass
+# NOTE: compiling the hot Job methods (update_progress/get_eta_seconds/
+# to_dict) with Cython was considered for high-frequency polling, but this
+# app deploys as plain Python with no build step (Streamlit Cloud installs
+# straight from requirements.txt). The slots/memoization work above keeps
+# the pure-Python versions cheap enough; revisit only if profiling ever
+# shows these methods dominating.
+@dataclass(slots=True)
 class Job:
     """Represents a background processing job"""
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = field(default_factory=_next_id)
     type: JobType = JobType.VIDEO_PROCESSING
     status: JobStatus = JobStatus.PENDING
     progress: float = 0.0
@@ -41,33 +62,58 @@ class Job:
     processed_frames: int = 0
     current_stage: str = ""
     estimated_completion: Optional[float] = None
-    
+
+    # Internal bookkeeping (slots require these to be declared as fields):
+    # to_dict memoization plus a back-reference to the owning queue
+    _dirty: bool = field(default=True, init=False, repr=False, compare=False)
+    _cached_dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _queue: Optional['JobQueue'] = field(default=None, init=False, repr=False, compare=False)
+    # Enum .value goes through the descriptor protocol on every access;
+    # to_dict runs far more often than status transitions, so the strings
+    # are cached here and refreshed on transition.
+    _status_str: str = field(default="", init=False, repr=False, compare=False)
+    _type_str: str = field(default="", init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._status_str = self.status.value
+        self._type_str = self.type.value
+
+    def _set_status(self, new_status: 'JobStatus'):
+        """Change status and keep the owning queue's index in sync"""
+        old_status = self.status
+        self.status = new_status
+        self._status_str = new_status.value
+        self._dirty = True
+        if self._queue is not None:
+            self._queue._update_status_index(self.id, old_status, new_status)
+
     def start(self):
         """Mark job as started"""
-        self.status = JobStatus.RUNNING
+        self._set_status(JobStatus.RUNNING)
         self.started_at = time.time()
-    
+
     def complete(self, output_data: Dict[str, Any] = None):
         """Mark job as completed"""
-        self.status = JobStatus.COMPLETED
+        self._set_status(JobStatus.COMPLETED)
         self.completed_at = time.time()
         self.progress = 100.0
         if output_data:
             self.output_data.update(output_data)
-    
+
     def fail(self, error_message: str):
         """Mark job as failed"""
-        self.status = JobStatus.FAILED
+        self._set_status(JobStatus.FAILED)
         self.completed_at = time.time()
         self.error_message = error_message
-    
+
     def cancel(self):
         """Cancel the job"""
-        self.status = JobStatus.CANCELLED
+        self._set_status(JobStatus.CANCELLED)
         self.completed_at = time.time()
     
-    def update_progress(self, progress: float, current_stage: str = "", processed_frames: int = None):
+    def update_progress(self, progress: float, current_stage: str = "", processed_frames: int = None, now: Optional[float] = None):
         """Update job progress"""
+        self._dirty = True
         self.progress = max(0.0, min(100.0, progress))
         if current_stage:
             self.current_stage = current_stage
@@ -76,64 +122,84 @@ class Job:
             
         # Estimate completion time
         if self.started_at and self.progress > 0:
-            elapsed = time.time() - self.started_at
+            elapsed = (now if now is not None else time.time()) - self.started_at
             estimated_total = (elapsed / self.progress) * 100
             self.estimated_completion = self.started_at + estimated_total
     
-    def get_duration(self) -> float:
+    def get_duration(self, now: Optional[float] = None) -> float:
         """Get job duration in seconds"""
         if self.started_at:
-            end_time = self.completed_at or time.time()
+            end_time = self.completed_at or (now if now is not None else time.time())
             return end_time - self.started_at
         return 0.0
     
-    def get_eta_seconds(self) -> Optional[float]:
+    def get_eta_seconds(self, now: Optional[float] = None) -> Optional[float]:
         """Get estimated time to completion in seconds"""
         if self.estimated_completion and self.status == JobStatus.RUNNING:
-            eta = self.estimated_completion - time.time()
+            eta = self.estimated_completion - (now if now is not None else time.time())
             return max(0, eta)
         return None
     
-    def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self, now: Optional[float] = None) -> Dict[str, Any]:
         """Convert job to dictionary"""
-        return {
-            'id': self.id,
-            'type': self.type.value,
-            'status': self.status.value,
-            'progress': self.progress,
-            'created_at': self.created_at,
-            'started_at': self.started_at,
-            'completed_at': self.completed_at,
-            'duration': self.get_duration(),
-            'error_message': self.error_message,
-            'total_frames': self.total_frames,
-            'processed_frames': self.processed_frames,
-            'current_stage': self.current_stage,
-            'eta_seconds': self.get_eta_seconds(),
-            'input_data': self.input_data,
-            'output_data': self.output_data,
-            'metadata': self.metadata
-        }
+        if self._dirty or self._cached_dict is None:
+            self._cached_dict = {
+                'id': self.id,
+                'type': self._type_str,
+                'status': self._status_str,
+                'progress': self.progress,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'completed_at': self.completed_at,
+                'duration': self.get_duration(now),
+                'error_message': self.error_message,
+                'total_frames': self.total_frames,
+                'processed_frames': self.processed_frames,
+                'current_stage': self.current_stage,
+                'eta_seconds': self.get_eta_seconds(now),
+                'input_data': self.input_data,
+                'output_data': self.output_data,
+                'metadata': self.metadata
+            }
+            self._dirty = False
+        else:
+            # These two depend on the clock even when the job is unchanged
+            self._cached_dict['duration'] = self.get_duration(now)
+            self._cached_dict['eta_seconds'] = self.get_eta_seconds(now)
+        return self._cached_dict
 
 class JobQueue:
     """Manages job queue and execution"""
     
     def __init__(self):
         self.jobs: Dict[str, Job] = {}
-        self.job_history: List[str] = []
         self.max_history = 100
-    
+        # deque makes the bounded append/evict O(1); a plain list pays an
+        # O(n) shift on every pop(0) once the history is full.
+        self.job_history: deque = deque(maxlen=self.max_history)
+        # Secondary index so get_jobs_by_status is O(matches), not O(jobs)
+        self._by_status: Dict[JobStatus, Set[str]] = {status: set() for status in JobStatus}
+
+    def _update_status_index(self, job_id: str, old_status: JobStatus, new_status: JobStatus):
+        """Move a job id between status buckets"""
+        self._by_status[old_status].discard(job_id)
+        self._by_status[new_status].add(job_id)
+
     def add_job(self, job: Job) -> str:
         """Add job to queue"""
         self.jobs[job.id] = job
-        self.job_history.append(job.id)
-        
-        # Keep history manageable
-        if len(self.job_history) > self.max_history:
-            old_job_id = self.job_history.pop(0)
+        job._queue = self
+        self._by_status[job.status].add(job.id)
+
+        # Evict the oldest history entry before the deque drops it silently
+        if len(self.job_history) == self.max_history:
+            old_job_id = self.job_history.popleft()
             if old_job_id in self.jobs and self.jobs[old_job_id].status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED]:
+                self._by_status[self.jobs[old_job_id].status].discard(old_job_id)
                 del self.jobs[old_job_id]
-        
+
+        self.job_history.append(job.id)
+
         return job.id
     
     def get_job(self, job_id: str) -> Optional[Job]:
@@ -142,7 +208,9 @@ class JobQueue:
     
     def get_jobs_by_status(self, status: JobStatus) -> List[Job]:
         """Get all jobs with specific status"""
-        return [job for job in self.jobs.values() if job.status == status]
+        # Guard against ids removed from self.jobs without going through
+        # the queue (e.g. the UI deleting entries directly)
+        return [self.jobs[job_id] for job_id in self._by_status[status] if job_id in self.jobs]
     
     def get_active_jobs(self) -> List[Job]:
         """Get all running jobs"""
@@ -160,20 +228,25 @@ class JobQueue:
             return True
         return False
     
-    def cleanup_completed_jobs(self, max_age_hours: int = 24):
+    def cleanup_completed_jobs(self, max_age_hours: int = 24, now: Optional[float] = None):
         """Remove old completed jobs"""
-        cutoff_time = time.time() - (max_age_hours * 3600)
-        jobs_to_remove = []
-        
-        for job_id, job in self.jobs.items():
-            if (job.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED] 
-                and job.completed_at and job.completed_at < cutoff_time):
-                jobs_to_remove.append(job_id)
-        
-        for job_id in jobs_to_remove:
-            del self.jobs[job_id]
-            if job_id in self.job_history:
-                self.job_history.remove(job_id)
+        cutoff_time = (now if now is not None else time.time()) - (max_age_hours * 3600)
+        jobs_to_remove = {
+            job_id for job_id, job in self.jobs.items()
+            if (job.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED]
+                and job.completed_at and job.completed_at < cutoff_time)
+        }
+
+        if jobs_to_remove:
+            for job_id in jobs_to_remove:
+                job = self.jobs.pop(job_id, None)
+                if job is not None:
+                    self._by_status[job.status].discard(job_id)
+            # Rebuild in one pass instead of O(n) remove() per id
+            self.job_history = deque(
+                (job_id for job_id in self.job_history if job_id not in jobs_to_remove),
+                maxlen=self.max_history
+            )
 
 def create_video_processing_job(
     file_path: str,
@@ -221,79 +294,126 @@ def create_batch_processing_job(
     
     return job
 
+def _submit_job(queue: JobQueue, job: Job) -> str:
+    """Submit a new job"""
+    return queue.add_job(job)
+
+def _submit_jobs(queue: JobQueue, jobs: List[Job]) -> List[str]:
+    """Submit a batch of jobs in one call
+
+    One call per batch instead of one per file keeps the submission a
+    single state-mutation event on the Streamlit side.
+    """
+    return [queue.add_job(job) for job in jobs]
+
+def _get_job_status(queue: JobQueue, job_id: str) -> Optional[JobStatus]:
+    """Get job status"""
+    job = queue.get_job(job_id)
+    return job.status if job else None
+
+def _get_job_progress(queue: JobQueue, job_id: str) -> float:
+    """Get job progress"""
+    job = queue.get_job(job_id)
+    return job.progress if job else 0.0
+
+def _cancel_job(queue: JobQueue, job_id: str) -> bool:
+    """Cancel a job"""
+    return queue.cancel_job(job_id)
+
+def _get_all_jobs(queue: JobQueue) -> List[Job]:
+    """Get all jobs"""
+    return list(queue.jobs.values())
+
+def _get_active_jobs(queue: JobQueue) -> List[Job]:
+    """Get active jobs"""
+    return queue.get_active_jobs()
+
+def _shared_now() -> float:
+    """Clock stamp shared by the current run
+
+    use_job_queue refreshes st.session_state['_rerun_now'] on every
+    full-page run, and fragment entry points that call these helpers
+    must refresh it at the top of each tick (the queue fragment does).
+    Falling back to time.time() keeps the helpers correct when neither
+    has run, rather than hard-assuming a full-page rerun.
+    """
+    return st.session_state.get('_rerun_now') or time.time()
+
+def _cleanup_old_jobs(queue: JobQueue, max_age_hours: int = 24, now: Optional[float] = None):
+    """Clean up old completed jobs"""
+    queue.cleanup_completed_jobs(max_age_hours, now=now if now is not None else _shared_now())
+
+def _poll_job_updates(queue: JobQueue, job_id: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Poll for job updates (to be called periodically)"""
+    job = queue.get_job(job_id)
+    if job is None:
+        return None
+
+    # TODO: This would integrate with actual backend polling
+    # For now, just return current job state. Repeat polls of an
+    # unchanged job hand back the previous snapshot without touching
+    # to_dict at all.
+    snapshots = st.session_state.setdefault('_job_poll_snapshots', {})
+    state_key = (job.status, job.progress)
+    cached = snapshots.get(job_id)
+    if cached is not None and cached[0] == state_key:
+        return cached[1]
+
+    payload = job.to_dict(now=now if now is not None else _shared_now())
+    snapshots[job_id] = (state_key, payload)
+    return payload
+
+def _simulate_job_progress(queue: JobQueue, job_id: str, now: Optional[float] = None):
+    """Simulate job progress for testing (remove when backend is ready)"""
+    job = queue.get_job(job_id)
+    if job is None or job.status in TERMINAL_STATES:
+        return
+    if job.status == JobStatus.PENDING:
+        job.start()
+    elif job.status == JobStatus.RUNNING:
+        # Simulate progress
+        if job.progress < 100:
+            job.update_progress(
+                progress=min(100, job.progress + 5),
+                current_stage="Processing frames...",
+                processed_frames=int(job.progress * job.total_frames / 100) if job.total_frames > 0 else None,
+                now=now if now is not None else _shared_now()
+            )
+        else:
+            job.complete({'output_path': '/path/to/processed/video.mp4'})
+
+def _build_job_api(queue: JobQueue) -> Dict[str, Any]:
+    """Bind the job helpers to a queue instance"""
+    return {
+        'queue': queue,
+        'submit_job': partial(_submit_job, queue),
+        'submit_jobs': partial(_submit_jobs, queue),
+        'get_job_status': partial(_get_job_status, queue),
+        'get_job_progress': partial(_get_job_progress, queue),
+        'cancel_job': partial(_cancel_job, queue),
+        'get_all_jobs': partial(_get_all_jobs, queue),
+        'get_active_jobs': partial(_get_active_jobs, queue),
+        'cleanup_old_jobs': partial(_cleanup_old_jobs, queue),
+        'poll_job_updates': partial(_poll_job_updates, queue),
+        'simulate_job_progress': partial(_simulate_job_progress, queue),  # Remove when backend ready
+        'create_video_job': create_video_processing_job,
+        'create_batch_job': create_batch_processing_job
+    }
+
 def use_job_queue():
     """Hook for managing job queue in Streamlit"""
-    
+
     # Initialize job queue if not exists
     if 'job_queue' not in st.session_state:
         st.session_state.job_queue = JobQueue()
-    
-    def submit_job(job: Job) -> str:
-        """Submit a new job"""
-        return st.session_state.job_queue.add_job(job)
-    
-    def get_job_status(job_id: str) -> Optional[JobStatus]:
-        """Get job status"""
-        job = st.session_state.job_queue.get_job(job_id)
-        return job.status if job else None
-    
-    def get_job_progress(job_id: str) -> float:
-        """Get job progress"""
-        job = st.session_state.job_queue.get_job(job_id)
-        return job.progress if job else 0.0
-    
-    def cancel_job(job_id: str) -> bool:
-        """Cancel a job"""
-        return st.session_state.job_queue.cancel_job(job_id)
-    
-    def get_all_jobs() -> List[Job]:
-        """Get all jobs"""
-        return list(st.session_state.job_queue.jobs.values())
-    
-    def get_active_jobs() -> List[Job]:
-        """Get active jobs"""
-        return st.session_state.job_queue.get_active_jobs()
-    
-    def cleanup_old_jobs(max_age_hours: int = 24):
-        """Clean up old completed jobs"""
-        st.session_state.job_queue.cleanup_completed_jobs(max_age_hours)
-    
-    def poll_job_updates(job_id: str) -> Optional[Dict[str, Any]]:
-        """Poll for job updates (to be called periodically)"""
-        job = st.session_state.job_queue.get_job(job_id)
-        if job:
-            # TODO: This would integrate with actual backend polling
-            # For now, just return current job state
-            return job.to_dict()
-        return None
-    
-    def simulate_job_progress(job_id: str):
-        """Simulate job progress for testing (remove when backend is ready)"""
-        job = st.session_state.job_queue.get_job(job_id)
-        if job and job.status == JobStatus.PENDING:
-            job.start()
-        elif job and job.status == JobStatus.RUNNING:
-            # Simulate progress
-            if job.progress < 100:
-                job.update_progress(
-                    progress=min(100, job.progress + 5),
-                    current_stage="Processing frames...",
-                    processed_frames=int(job.progress * job.total_frames / 100) if job.total_frames > 0 else None
-                )
-            else:
-                job.complete({'output_path': '/path/to/processed/video.mp4'})
-    
-    return {
-        'queue': st.session_state.job_queue,
-        'submit_job': submit_job,
-        'get_job_status': get_job_status,
-        'get_job_progress': get_job_progress,
-        'cancel_job': cancel_job,
-        'get_all_jobs': get_all_jobs,
-        'get_active_jobs': get_active_jobs,
-        'cleanup_old_jobs': cleanup_old_jobs,
-        'poll_job_updates': poll_job_updates,
-        'simulate_job_progress': simulate_job_progress,  # Remove when backend ready
-        'create_video_job': create_video_processing_job,
-        'create_batch_job': create_batch_processing_job
-    }
\ No newline at end of file
+
+    # One clock read per rerun; all time-sensitive helpers below share it
+    # instead of each issuing their own time.time() syscall.
+    st.session_state['_rerun_now'] = time.time()
+
+    # The bound-helper dict is built once per session; rebuilding ~10
+    # closures on every rerun was pure allocation churn.
+    if '_job_api' not in st.session_state:
+        st.session_state._job_api = _build_job_api(st.session_state.job_queue)
+
+    return st.session_state._job_api
@@ -1,10 +1,30 @@
 import time
 import threading
+from collections import deque
 from dataclasses import dataclass, field
 from typing import Dict, Any, Optional
+
+import numpy as np
 import streamlit as st
 
-@dataclass
+# Detection types as bit positions: the six-flag settings dict collapses
+# to one int, so copying is an integer assignment and comparing two
+# settings snapshots is a single equality check.
+_DET_BITS = {
+    'license_plates': 1,
+    'street_signs': 2,
+    'block_numbers': 4,
+    'faces': 8,
+    'documents': 16,
+    'screens': 32
+}
+_DET_NAMES = tuple(_DET_BITS.items())
+_DEFAULT_DET_MASK = (
+    _DET_BITS['license_plates'] | _DET_BITS['street_signs']
+    | _DET_BITS['faces'] | _DET_BITS['documents']
+)
+
+@dataclass(slots=True)
 class LiveStreamState:
     """State management for live streaming functionality"""
     is_streaming: bool = False
@@ -12,39 +32,40 @@ class LiveStreamState:
     fps: float = 0.0
     latency: float = 0.0
     detection_count: int = 0
-    stream_start_time: Optional[float] = None
-    last_frame_time: Optional[float] = None
+    # Monotonic nanosecond ticks (time.monotonic_ns): integer arithmetic
+    # is cheaper than float wall-clock math and immune to NTP steps.
+    # Only durations are derived from these, never calendar times.
+    stream_start_time: Optional[int] = None
+    last_frame_time: Optional[int] = None
     frame_count: int = 0
     total_detections: int = 0
     
     # Performance metrics
     avg_processing_time: float = 0.0
-    peak_memory_usage: float = 0.0
-    dropped_frames: int = 0
     
     # Stream settings
     resolution: str = "720p"
     bitrate: int = 5
     enable_audio: bool = False
     
-    # Detection settings
-    detection_settings: Dict[str, bool] = field(default_factory=lambda: {
-        'license_plates': True,
-        'street_signs': True,
-        'block_numbers': False,
-        'faces': True,
-        'documents': True,
-        'screens': False
-    })
-    
+    # Detection settings as a bitmask over _DET_BITS
+    detection_mask: int = _DEFAULT_DET_MASK
+
+    # to_dict caching: bumped by every mutating method; the serialized
+    # snapshot is rebuilt only when the version has moved on
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+    _cache_version: int = field(default=-1, init=False, repr=False, compare=False)
+    _cache_dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+
     def start_stream(self):
         """Start the live stream"""
         self.is_streaming = True
         self.is_webcam_active = True
-        self.stream_start_time = time.time()
+        self.stream_start_time = time.monotonic_ns()
         self.frame_count = 0
         self.detection_count = 0
-        
+        self._version += 1
+
         # Start performance monitoring
         self._start_performance_monitoring()
     
@@ -56,34 +77,41 @@ class LiveStreamState:
         self.last_frame_time = None
         self.fps = 0.0
         self.latency = 0.0
-    
-    def update_frame_stats(self, processing_time: float = 0.0, detections_in_frame: int = 0):
-        """Update frame-level statistics"""
-        current_time = time.time()
-        
-        if self.last_frame_time:
+        self._version += 1
+
+    def update_frame_stats(self, processing_time: float = 0.0, detections_in_frame: int = 0, _monotonic_ns=time.monotonic_ns):
+        """Update frame-level statistics
+
+        Runs once per frame, so attribute reads are bound to locals once
+        and the running average uses the incremental (Welford) form,
+        which is both cheaper and numerically stable as frame_count grows.
+        """
+        current_time = _monotonic_ns()
+
+        last_frame_time = self.last_frame_time
+        if last_frame_time:
             # Calculate FPS
-            time_diff = current_time - self.last_frame_time
+            time_diff = current_time - last_frame_time
             if time_diff > 0:
-                self.fps = 1.0 / time_diff
-        
+                self.fps = 1e9 / time_diff
+
+        frame_count = self.frame_count + 1
         self.last_frame_time = current_time
-        self.frame_count += 1
+        self.frame_count = frame_count
         self.detection_count += detections_in_frame
         self.total_detections += detections_in_frame
-        
+
         # Update average processing time
         if processing_time > 0:
-            self.avg_processing_time = (
-                (self.avg_processing_time * (self.frame_count - 1) + processing_time) / self.frame_count
-            )
+            self.avg_processing_time += (processing_time - self.avg_processing_time) / frame_count
             # Latency is approximated by processing time
             self.latency = processing_time * 1000  # Convert to ms
+        self._version += 1
     
     def get_stream_duration(self) -> float:
         """Get current stream duration in seconds"""
         if self.stream_start_time:
-            return time.time() - self.stream_start_time
+            return (time.monotonic_ns() - self.stream_start_time) / 1e9
         return 0.0
     
     def get_average_fps(self) -> float:
@@ -102,12 +130,22 @@ class LiveStreamState:
     
     def update_detection_setting(self, setting: str, enabled: bool):
         """Update a specific detection setting"""
-        if setting in self.detection_settings:
-            self.detection_settings[setting] = enabled
+        bit = _DET_BITS.get(setting)
+        if bit:
+            mask = (self.detection_mask | bit) if enabled else (self.detection_mask & ~bit)
+            if mask != self.detection_mask:
+                self.detection_mask = mask
+                self._version += 1
     
     def get_enabled_detections(self) -> list:
         """Get list of currently enabled detection types"""
-        return [key for key, value in self.detection_settings.items() if value]
+        mask = self.detection_mask
+        return [name for name, bit in _DET_NAMES if mask & bit]
+
+    def get_detection_settings(self) -> Dict[str, bool]:
+        """Expand the bitmask into the dict shape used at API boundaries"""
+        mask = self.detection_mask
+        return {name: bool(mask & bit) for name, bit in _DET_NAMES}
     
     def _start_performance_monitoring(self):
         """Start background performance monitoring"""
@@ -115,8 +153,21 @@ class LiveStreamState:
         pass
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert state to dictionary for serialization"""
-        return {
+        """Convert state to dictionary for serialization
+
+        The snapshot is memoized against a version counter bumped by the
+        mutating methods, so repeat polls of an unchanged state only
+        refresh the clock-derived duration instead of rebuilding the
+        dict. Detection settings serialize as the raw bitmask; callers
+        needing the dict shape use get_detection_settings().
+        """
+        cached = self._cache_dict
+        if cached is not None and self._cache_version == self._version:
+            cached['stream_duration'] = self.get_stream_duration()
+            return cached
+
+        self._cache_version = self._version
+        self._cache_dict = {
             'is_streaming': self.is_streaming,
             'is_webcam_active': self.is_webcam_active,
             'fps': self.fps,
@@ -129,17 +180,69 @@ class LiveStreamState:
             'resolution': self.resolution,
             'bitrate': self.bitrate,
             'enable_audio': self.enable_audio,
-            'detection_settings': self.detection_settings.copy()
+            'detection_mask': self.detection_mask
         }
+        return self._cache_dict
 
 class WebRTCManager:
-    """Manages WebRTC connections and streaming"""
-    
+    """Manages WebRTC connections and streaming
+
+    Frame producers hand their per-frame metrics to a bounded deque and
+    a single drainer thread folds them into the shared state objects.
+    deque.append/popleft are atomic in CPython, so the frame path does
+    one append instead of contending on state attribute writes.
+    """
+
+    __slots__ = ('is_connected', 'peer_connection', 'local_stream', 'remote_stream',
+                 '_queue', '_data_ready', '_drain_thread', '_drain_running')
+
     def __init__(self):
         self.is_connected = False
         self.peer_connection = None
         self.local_stream = None
         self.remote_stream = None
+        self._queue = deque(maxlen=4096)
+        self._data_ready = threading.Event()
+        self._drain_thread = None
+        self._drain_running = False
+
+    def enqueue_metrics(self, fps: float, latency: float, detections: int, timestamp: float = None):
+        """Queue one frame's metrics for the drainer thread"""
+        self._queue.append((timestamp if timestamp is not None else time.time(),
+                            fps, latency, detections))
+        self._data_ready.set()
+
+    def start_metrics_drainer(self, state: LiveStreamState, metrics: 'StreamMetrics'):
+        """Start the single consumer thread folding queued metrics"""
+        if self._drain_thread is not None and self._drain_thread.is_alive():
+            return
+        self._drain_running = True
+        self._drain_thread = threading.Thread(
+            target=self._drain_loop, args=(state, metrics), daemon=True
+        )
+        self._drain_thread.start()
+
+    def stop_metrics_drainer(self):
+        """Signal the drainer thread to exit"""
+        self._drain_running = False
+        self._data_ready.set()
+
+    def _drain_loop(self, state: LiveStreamState, metrics: 'StreamMetrics'):
+        # Event-driven wakeup: the consumer sleeps until a producer
+        # appends, then clears the event *before* draining to empty so an
+        # append racing the drain re-sets it and is never lost.
+        queue = self._queue
+        data_ready = self._data_ready
+        while self._drain_running:
+            data_ready.wait(timeout=1.0)
+            data_ready.clear()
+            while True:
+                try:
+                    timestamp, fps, latency, detections = queue.popleft()
+                except IndexError:
+                    break
+                state.update_frame_stats(latency / 1000, detections)
+                metrics.add_metrics(fps, latency, detections, timestamp)
     
     def initialize_connection(self):
         """Initialize WebRTC peer connection"""
@@ -168,45 +271,89 @@ class WebRTCManager:
         return None
 
 class StreamMetrics:
-    """Handles stream performance metrics"""
-    
+    """Handles stream performance metrics
+
+    History is a fixed-size structure-of-arrays ring buffer: inserts are
+    O(1) scalar stores instead of dict allocation plus list.pop(0), and
+    the averages are single vectorized reductions per column.
+    """
+
+    __slots__ = ('max_history_size', '_ts', '_fps', '_lat', '_det', '_head', '_count')
+
     def __init__(self):
-        self.metrics_history = []
         self.max_history_size = 1000
-    
+        n = self.max_history_size
+        self._ts = np.empty(n, np.float64)
+        self._fps = np.empty(n, np.float32)
+        self._lat = np.empty(n, np.float32)
+        self._det = np.empty(n, np.int32)
+        self._head = 0
+        self._count = 0
+
     def add_metrics(self, fps: float, latency: float, detections: int, timestamp: float = None):
         """Add metrics point to history"""
         if timestamp is None:
             timestamp = time.time()
-        
-        metrics_point = {
-            'timestamp': timestamp,
-            'fps': fps,
-            'latency': latency,
-            'detections': detections
-        }
-        
-        self.metrics_history.append(metrics_point)
-        
-        # Keep history size manageable
-        if len(self.metrics_history) > self.max_history_size:
-            self.metrics_history.pop(0)
-    
+
+        head = self._head
+        self._ts[head] = timestamp
+        self._fps[head] = fps
+        self._lat[head] = latency
+        self._det[head] = detections
+        self._head = (head + 1) % self.max_history_size
+        if self._count < self.max_history_size:
+            self._count += 1
+
+    def _recent_slices(self, seconds: int):
+        """Index ranges of samples newer than the cutoff, oldest first
+
+        Timestamps are monotonic in insertion order, so the cutoff is
+        found with searchsorted in O(log n) instead of building a boolean
+        mask over the whole buffer. A wrapped buffer is two sorted halves
+        ([head:n) then [0:head)), each searched independently.
+        """
+        cutoff_time = time.time() - seconds
+        n = self.max_history_size
+        if self._count < n:
+            idx = int(np.searchsorted(self._ts[:self._count], cutoff_time))
+            return [(idx, self._count)] if idx < self._count else []
+
+        head = self._head
+        idx = int(np.searchsorted(self._ts[head:n], cutoff_time))
+        if head + idx < n:
+            # Part of the older half qualifies, so all of the newer half does
+            slices = [(head + idx, n)]
+            if head:
+                slices.append((0, head))
+            return slices
+
+        idx = int(np.searchsorted(self._ts[:head], cutoff_time))
+        return [(idx, head)] if idx < head else []
+
     def get_recent_metrics(self, seconds: int = 60):
         """Get metrics from last N seconds"""
-        cutoff_time = time.time() - seconds
-        return [m for m in self.metrics_history if m['timestamp'] >= cutoff_time]
-    
+        return [
+            {'timestamp': ts, 'fps': fps, 'latency': lat, 'detections': det}
+            for start, stop in self._recent_slices(seconds)
+            for ts, fps, lat, det in zip(
+                self._ts[start:stop].tolist(),
+                self._fps[start:stop].tolist(),
+                self._lat[start:stop].tolist(),
+                self._det[start:stop].tolist()
+            )
+        ]
+
     def get_average_metrics(self, seconds: int = 60):
         """Get average metrics over last N seconds"""
-        recent = self.get_recent_metrics(seconds)
-        if not recent:
+        slices = self._recent_slices(seconds)
+        total = sum(stop - start for start, stop in slices)
+        if total == 0:
             return {'fps': 0.0, 'latency': 0.0, 'detections': 0.0}
-        
+
         return {
-            'fps': sum(m['fps'] for m in recent) / len(recent),
-            'latency': sum(m['latency'] for m in recent) / len(recent),
-            'detections': sum(m['detections'] for m in recent) / len(recent)
+            'fps': float(sum(self._fps[a:b].sum() for a, b in slices)) / total,
+            'latency': float(sum(self._lat[a:b].sum() for a, b in slices)) / total,
+            'detections': float(sum(self._det[a:b].sum() for a, b in slices)) / total
         }
 
 def use_live_stream():
@@ -227,18 +374,27 @@ def use_live_stream():
         st.session_state.live_state.start_stream()
         st.session_state.webrtc_manager.initialize_connection()
         st.session_state.webrtc_manager.start_local_stream()
+        st.session_state.webrtc_manager.start_metrics_drainer(
+            st.session_state.live_state, st.session_state.stream_metrics
+        )
         return True
     
     def stop_stream():
         """Stop streaming and cleanup"""
+        st.session_state.webrtc_manager.stop_metrics_drainer()
         st.session_state.live_state.stop_stream()
         st.session_state.webrtc_manager.stop_local_stream()
         return True
     
     def update_metrics(fps: float = 0.0, latency: float = 0.0, detections: int = 0):
         """Update streaming metrics"""
-        st.session_state.live_state.update_frame_stats(latency/1000, detections)
-        st.session_state.stream_metrics.add_metrics(fps, latency, detections)
+        manager = st.session_state.webrtc_manager
+        if manager._drain_running:
+            # Producer path: one atomic append, folded by the drainer
+            manager.enqueue_metrics(fps, latency, detections)
+        else:
+            st.session_state.live_state.update_frame_stats(latency/1000, detections)
+            st.session_state.stream_metrics.add_metrics(fps, latency, detections)
     
     def get_state():
         """Get current live stream state"""
@@ -1,11 +1,69 @@
 import asyncio
 import aiohttp
-import json
+import itertools
+import orjson
+import os
+import random
+import threading
 from typing import Dict, List, Optional, Any, Union
 import streamlit as st
 from dataclasses import asdict
 import base64
 import io
+import time
+from functools import lru_cache, wraps
+
+def _ttl_cache(ttl_seconds: float):
+    """TTL cache for idempotent async GET methods
+
+    Results are kept per (instance, args) with a monotonic expiry, so
+    rerun-driven polling stops hammering endpoints that change rarely.
+    Pass bypass_cache=True to force a refresh.
+    """
+    def decorator(func):
+        cache = {}
+
+        @wraps(func)
+        async def wrapper(*args, bypass_cache: bool = False):
+            key = args
+            if not bypass_cache:
+                entry = cache.get(key)
+                if entry is not None and time.monotonic() - entry[0] < ttl_seconds:
+                    return entry[1]
+            result = await func(*args)
+            cache[key] = (time.monotonic(), result)
+            return result
+
+        return wrapper
+    return decorator
+
+# Detection settings have a fixed six-flag schema, so every possible
+# combination fits a 6-bit mask and its JSON encoding can be cached.
+_DET_BITS = {
+    'license_plates': 1,
+    'street_signs': 2,
+    'block_numbers': 4,
+    'faces': 8,
+    'documents': 16,
+    'screens': 32
+}
+_DEFAULT_DET_MASK = (
+    _DET_BITS['license_plates'] | _DET_BITS['street_signs']
+    | _DET_BITS['faces'] | _DET_BITS['documents']
+)
+
+def _settings_mask(detection_settings: Dict[str, bool]) -> int:
+    """Fold a settings dict into its bitmask, applying schema defaults"""
+    mask = 0
+    for name, bit in _DET_BITS.items():
+        if detection_settings.get(name, bool(_DEFAULT_DET_MASK & bit)):
+            mask |= bit
+    return mask
+
+@lru_cache(maxsize=64)
+def _detection_json(mask: int) -> bytes:
+    """JSON bytes for a settings bitmask; 64 possible values, cached"""
+    return orjson.dumps({name: bool(mask & bit) for name, bit in _DET_BITS.items()})
 
 class StreamSafeAPI:
     """API client for StreamSafe backend services"""
@@ -13,11 +71,24 @@ class StreamSafeAPI:
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url.rstrip('/')
         self.session = None
-    
+        # Shared connector/timeout so the polling endpoints reuse warm
+        # TCP connections instead of paying handshake latency per call
+        self._connector = None
+        self._timeout = aiohttp.ClientTimeout(total=10, sock_connect=2)
+        self._headers = {'Accept': 'application/json'}
+
     async def _get_session(self):
         """Get or create aiohttp session"""
         if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession()
+            if self._connector is None or self._connector.closed:
+                self._connector = aiohttp.TCPConnector(
+                    limit=32, ttl_dns_cache=300, keepalive_timeout=60
+                )
+            self.session = aiohttp.ClientSession(
+                connector=self._connector,
+                timeout=self._timeout,
+                json_serialize=lambda obj, _dumps=orjson.dumps: _dumps(obj).decode()
+            )
         return self.session
     
     async def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
@@ -26,9 +97,11 @@ class StreamSafeAPI:
         url = f"{self.base_url}{endpoint}"
         
         try:
-            async with session.request(method, url, **kwargs) as response:
+            async with session.request(method, url, headers=self._headers, **kwargs) as response:
                 if response.content_type == 'application/json':
-                    return await response.json()
+                    # orjson.loads on the raw bytes skips aiohttp's
+                    # charset detection and the slower stdlib parser
+                    return orjson.loads(await response.read())
                 else:
                     return {'data': await response.text(), 'status': response.status}
         except Exception as e:
@@ -39,10 +112,32 @@ class StreamSafeAPI:
         """Upload video for processing"""
         data = aiohttp.FormData()
         data.add_field('file', file_data, filename=filename)
-        data.add_field('detection_settings', json.dumps(detection_settings))
+        data.add_field(
+            'detection_settings',
+            _detection_json(_settings_mask(detection_settings)),
+            content_type='application/json'
+        )
         
         return await self._make_request('POST', '/api/upload', data=data)
-    
+
+    async def upload_video_stream(self, file_obj, filename: str, detection_settings: Dict[str, bool]) -> Dict[str, Any]:
+        """Upload video from a file-like object without buffering it
+
+        aiohttp streams file-like payloads to the socket in chunks, so
+        peak memory stays at one write buffer instead of the whole file
+        (up to 100MB under the upload limit) living in the heap.
+        """
+        data = aiohttp.FormData()
+        data.add_field('file', file_obj, filename=filename,
+                       content_type='application/octet-stream')
+        data.add_field(
+            'detection_settings',
+            _detection_json(_settings_mask(detection_settings)),
+            content_type='application/json'
+        )
+
+        return await self._make_request('POST', '/api/upload', data=data)
+
     async def start_video_processing(self, job_id: str, detection_settings: Dict[str, bool]) -> Dict[str, Any]:
         """Start processing uploaded video"""
         payload = {
@@ -111,43 +206,79 @@ class StreamSafeAPI:
         """Add ICE candidate"""
         return await self._make_request('POST', f'/api/webrtc/{session_id}/ice', json=candidate)
     
-    # System APIs
+    # System APIs. Health is useful at ~1Hz resolution; models and
+    # capabilities effectively never change within a session.
+    @_ttl_cache(1.0)
     async def get_system_health(self) -> Dict[str, Any]:
         """Get system health status"""
         return await self._make_request('GET', '/api/system/health')
     
+    @_ttl_cache(3600)
     async def get_available_models(self) -> Dict[str, Any]:
         """Get available AI models"""
         return await self._make_request('GET', '/api/models')
     
+    @_ttl_cache(3600)
     async def get_detection_capabilities(self) -> Dict[str, Any]:
         """Get supported detection types"""
         return await self._make_request('GET', '/api/detection/capabilities')
+
+    async def get_dashboard_snapshot(self, job_id: str, stream_id: str) -> Dict[str, Any]:
+        """Fetch job status, live metrics and system health concurrently
+
+        The three polls share the connector pool, so asyncio.gather
+        collapses three sequential round-trips into one parallel round.
+        """
+        job_status, live_metrics, system_health = await asyncio.gather(
+            self.get_job_status(job_id),
+            self.get_live_metrics(stream_id),
+            self.get_system_health()
+        )
+        return {
+            'job_status': job_status,
+            'live_metrics': live_metrics,
+            'system_health': system_health
+        }
     
     async def close(self):
         """Close API session"""
         if self.session and not self.session.closed:
             await self.session.close()
+        if self._connector and not self._connector.closed:
+            await self._connector.close()
 
 # Synchronous wrapper functions for Streamlit compatibility
 class StreamSafeAPISync:
-    """Synchronous wrapper for StreamSafeAPI"""
-    
+    """Synchronous wrapper for StreamSafeAPI
+
+    Runs a single long-lived event loop in a daemon thread and submits
+    coroutines to it. Creating a fresh loop per call (the previous
+    behaviour) tore down loop state every time and left the aiohttp
+    session bound to a dead loop, defeating connection keep-alive.
+    """
+
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.api = StreamSafeAPI(base_url)
-    
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
     def _run_async(self, coro):
-        """Run async function in sync context"""
+        """Run async function on the background loop and wait for it"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout=30)
+
+    def close(self):
+        """Close the API session and stop the background loop"""
         try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        return loop.run_until_complete(coro)
+            self._run_async(self.api.close())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
     
     def upload_video(self, file_data: bytes, filename: str, detection_settings: Dict[str, bool]) -> Dict[str, Any]:
         return self._run_async(self.api.upload_video(file_data, filename, detection_settings))
+
+    def upload_video_stream(self, file_obj, filename: str, detection_settings: Dict[str, bool]) -> Dict[str, Any]:
+        return self._run_async(self.api.upload_video_stream(file_obj, filename, detection_settings))
     
     def start_video_processing(self, job_id: str, detection_settings: Dict[str, bool]) -> Dict[str, Any]:
         return self._run_async(self.api.start_video_processing(job_id, detection_settings))
@@ -176,6 +307,9 @@ class StreamSafeAPISync:
     def get_system_health(self) -> Dict[str, Any]:
         return self._run_async(self.api.get_system_health())
 
+    def get_dashboard_snapshot(self, job_id: str, stream_id: str) -> Dict[str, Any]:
+        return self._run_async(self.api.get_dashboard_snapshot(job_id, stream_id))
+
 # Mock API for development (when backend isn't ready)
 class MockStreamSafeAPI:
     """Mock API for frontend development"""
@@ -183,11 +317,16 @@ class MockStreamSafeAPI:
     def __init__(self):
         self.mock_jobs = {}
         self.mock_streams = {}
-        import uuid
-        self.uuid = uuid
-    
+        # Dev-only ids: a monotonic counter is plenty (they are just dict
+        # keys here) and avoids the os.urandom syscall behind uuid4
+        self._job_ids = itertools.count(1)
+        self._stream_ids = itertools.count(1)
+        # Progress is mutated from polling calls that may arrive from
+        # several Streamlit sessions at once
+        self._progress_lock = threading.Lock()
+
     def upload_video(self, file_data: bytes, filename: str, detection_settings: Dict[str, bool]) -> Dict[str, Any]:
-        job_id = str(self.uuid.uuid4())
+        job_id = f"job-{next(self._job_ids)}"
         self.mock_jobs[job_id] = {
             'status': 'uploaded',
             'progress': 0,
@@ -205,11 +344,13 @@ class MockStreamSafeAPI:
     def get_job_status(self, job_id: str) -> Dict[str, Any]:
         if job_id in self.mock_jobs:
             job = self.mock_jobs[job_id]
-            # Simulate progress
-            if job['status'] == 'processing' and job['progress'] < 100:
-                job['progress'] = min(100, job['progress'] + 10)
-                if job['progress'] >= 100:
-                    job['status'] = 'completed'
+            # Simulate progress; the lock stops concurrent polls from
+            # double-incrementing the same job
+            with self._progress_lock:
+                if job['status'] == 'processing' and job['progress'] < 100:
+                    job['progress'] = min(100, job['progress'] + 10)
+                    if job['progress'] >= 100:
+                        job['status'] = 'completed'
             
             return {
                 'job_id': job_id,
@@ -230,7 +371,7 @@ class MockStreamSafeAPI:
         return status
     
     def start_live_stream(self, detection_settings: Dict[str, bool], stream_config: Dict[str, Any]) -> Dict[str, Any]:
-        stream_id = str(self.uuid.uuid4())
+        stream_id = f"stream-{next(self._stream_ids)}"
         self.mock_streams[stream_id] = {
             'status': 'active',
             'detection_settings': detection_settings,
@@ -251,11 +392,11 @@ class MockStreamSafeAPI:
         if stream_id in self.mock_streams:
             stream = self.mock_streams[stream_id]
             # Simulate changing metrics
-            import random
+            uniform = random.uniform
             return {
                 'stream_id': stream_id,
-                'fps': round(stream['fps'] + random.uniform(-2, 2), 1),
-                'latency': round(stream['latency'] + random.uniform(-10, 10), 1),
+                'fps': round(stream['fps'] + uniform(-2, 2), 1),
+                'latency': round(stream['latency'] + uniform(-10, 10), 1),
                 'detections': stream['detections'] + random.randint(0, 5),
                 'status': stream['status']
             }
@@ -272,46 +413,109 @@ class MockStreamSafeAPI:
         }
 
 # Helper functions
+@st.cache_resource
 def get_api_client(use_mock: bool = True) -> Union[StreamSafeAPISync, MockStreamSafeAPI]:
-    """Get appropriate API client"""
+    """Get appropriate API client
+
+    Cached as a resource: StreamSafeAPISync owns a worker thread and a
+    long-lived event loop, so constructing one per rerun would leak
+    both. Callers share the one memoized instance per use_mock value.
+    """
     if use_mock or st.secrets.get("USE_MOCK_API", True):
         return MockStreamSafeAPI()
     else:
         base_url = st.secrets.get("STREAMSAFE_API_URL", "http://localhost:8000")
         return StreamSafeAPISync(base_url)
 
+_SIZE_NAMES = ("B", "KB", "MB", "GB")
+
 def format_file_size(size_bytes: int) -> str:
     """Format file size in human readable format"""
-    if size_bytes == 0:
+    if size_bytes <= 0:
         return "0B"
-    size_names = ["B", "KB", "MB", "GB"]
-    import math
-    i = int(math.floor(math.log(size_bytes, 1024)))
-    p = math.pow(1024, i)
-    s = round(size_bytes / p, 2)
-    return f"{s} {size_names[i]}"
+    # bit_length() // 10 is floor(log1024(n)) for integers, so the unit
+    # index comes from integer ops instead of two float math calls
+    i = min((size_bytes.bit_length() - 1) // 10, len(_SIZE_NAMES) - 1)
+    s = round(size_bytes / (1 << (10 * i)), 2)
+    return f"{s} {_SIZE_NAMES[i]}"
+
+# Validation constants are built once at import; the error strings never
+# change, so they are not re-joined/re-formatted per upload.
+_MAX_UPLOAD_SIZE = 100 * 1024 * 1024  # 100MB limit for demo
+_VALID_EXTS = frozenset(['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm'])
+_SIZE_ERROR = f'File too large. Maximum size is {format_file_size(_MAX_UPLOAD_SIZE)}'
+_EXT_ERROR = f'Invalid file type. Supported: {", ".join(sorted(_VALID_EXTS))}'
 
 def validate_video_file(file_data: bytes, filename: str) -> Dict[str, Any]:
     """Validate uploaded video file"""
     # Check file size (limit to 100MB for demo)
-    max_size = 100 * 1024 * 1024
-    if len(file_data) > max_size:
-        return {'valid': False, 'error': f'File too large. Maximum size is {format_file_size(max_size)}'}
-    
-    # Check file extension
-    valid_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm']
-    if not any(filename.lower().endswith(ext) for ext in valid_extensions):
-        return {'valid': False, 'error': f'Invalid file type. Supported: {", ".join(valid_extensions)}'}
-    
+    if len(file_data) > _MAX_UPLOAD_SIZE:
+        return {'valid': False, 'error': _SIZE_ERROR}
+
+    # Check file extension with a single splitext + set lookup instead of
+    # scanning every extension with endswith
+    if os.path.splitext(filename)[1].lower() not in _VALID_EXTS:
+        return {'valid': False, 'error': _EXT_ERROR}
+
     return {'valid': True, 'size': len(file_data), 'formatted_size': format_file_size(len(file_data))}
 
+# Container signatures by extension: enough bytes to reject mislabeled
+# files without reading past the header
+def _is_mp4(h): return h[4:8] == b'ftyp'
+def _is_avi(h): return h[:4] == b'RIFF' and h[8:12] == b'AVI '
+def _is_mkv(h): return h[:4] == b'\x1aE\xdf\xa3'
+def _is_wmv(h): return h[:4] == b'0&\xb2u'
+def _is_flv(h): return h[:3] == b'FLV'
+
+_MAGIC_CHECKS = {
+    '.mp4': _is_mp4,
+    '.mov': _is_mp4,
+    '.avi': _is_avi,
+    '.mkv': _is_mkv,
+    '.webm': _is_mkv,
+    '.wmv': _is_wmv,
+    '.flv': _is_flv
+}
+
+def validate_video_file_header(header: bytes, filename: str, size: int) -> Dict[str, Any]:
+    """Validate an upload from its first bytes and reported size
+
+    Needs only the file header (a few KB), so rejected files never cost
+    a full read into memory. The magic-byte check also catches files
+    renamed to a video extension.
+    """
+    if size > _MAX_UPLOAD_SIZE:
+        return {'valid': False, 'error': _SIZE_ERROR}
+
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in _VALID_EXTS:
+        return {'valid': False, 'error': _EXT_ERROR}
+
+    check = _MAGIC_CHECKS.get(ext)
+    if check is not None and not check(header):
+        return {'valid': False, 'error': f'File content does not look like a {ext} video'}
+
+    return {'valid': True, 'size': size, 'formatted_size': format_file_size(size)}
+
+def validate_video_stream(file_obj, filename: str) -> Dict[str, Any]:
+    """Validate an uploaded video from a seekable file-like object
+
+    Sizes via seek/tell so the file never has to be read into memory;
+    pair with upload_video_stream for end-to-end streaming uploads.
+    """
+    if os.path.splitext(filename)[1].lower() not in _VALID_EXTS:
+        return {'valid': False, 'error': _EXT_ERROR}
+
+    pos = file_obj.tell()
+    size = file_obj.seek(0, io.SEEK_END)
+    file_obj.seek(pos)
+
+    if size > _MAX_UPLOAD_SIZE:
+        return {'valid': False, 'error': _SIZE_ERROR}
+
+    return {'valid': True, 'size': size, 'formatted_size': format_file_size(size)}
+
 def create_detection_payload(detection_settings: Dict[str, bool]) -> Dict[str, Any]:
     """Create detection settings payload for API"""
-    return {
-        'license_plates': detection_settings.get('license_plates', True),
-        'street_signs': detection_settings.get('street_signs', True), 
-        'block_numbers': detection_settings.get('block_numbers', False),
-        'faces': detection_settings.get('faces', True),
-        'documents': detection_settings.get('documents', True),
-        'screens': detection_settings.get('screens', False)
-    }
\ No newline at end of file
+    mask = _settings_mask(detection_settings)
+    return {name: bool(mask & bit) for name, bit in _DET_BITS.items()}
\ No newline at end of file
@@ -1,8 +1,8 @@
 import streamlit as st
 import time
 from app.hooks.use_job import use_job_queue, create_video_processing_job, JobStatus
-from app.lib.api import get_api_client, validate_video_file, format_file_size
-from app.lib.utils import format_duration, format_eta, create_progress_bar_html, get_status_emoji
+from app.lib.api import get_api_client, validate_video_file_header, validate_video_stream, format_file_size
+from app.lib.utils import format_duration, format_eta, create_progress_bar_html, get_status_emoji, DEFAULT_DETECTION_SETTINGS
 from app.components.cards import privacy_detection_card
 
 def render_upload_page():
@@ -27,16 +27,12 @@ def render_upload_page():
     
     # Detection settings
     st.markdown("### 🔍 Privacy Detection Settings")
-    detection_settings = privacy_detection_card(
-        st.session_state.get('upload_detection_settings', {
-            'license_plates': True,
-            'street_signs': True,
-            'block_numbers': False,
-            'faces': True,
-            'documents': True,
-            'screens': False
-        })
+    privacy_detection_card(
+        st.session_state.get('upload_detection_settings', DEFAULT_DETECTION_SETTINGS)
     )
+    # The card runs as a fragment, so read its output from session state
+    # rather than the (possibly stale) return value.
+    detection_settings = st.session_state.get('privacy_settings', {})
     st.session_state.upload_detection_settings = detection_settings
     
     st.markdown("---")
@@ -58,9 +54,11 @@ def upload_section():
     )
     
     if uploaded_file is not None:
-        # Validate file
-        file_data = uploaded_file.read()
-        validation = validate_video_file(file_data, uploaded_file.name)
+        # Sniff only the header: rejected files never get read in full,
+        # and the payload stays out of the heap until processing starts
+        header = uploaded_file.read(4096)
+        uploaded_file.seek(0)
+        validation = validate_video_file_header(header, uploaded_file.name, uploaded_file.size)
         
         if not validation['valid']:
             st.error(f"❌ {validation['error']}")
@@ -81,11 +79,27 @@ def upload_section():
         
         with col_process:
             if st.button("🚀 Start Processing", type="primary", use_container_width=True):
-                process_video_upload(uploaded_file.name, file_data)
+                # getvalue() is the first point the payload is materialized
+                process_video_upload(uploaded_file.name, uploaded_file.getvalue())
         
         with col_cancel:
             if st.button("❌ Cancel", use_container_width=True):
-                st.experimental_rerun()
+                st.rerun()
+
+def _current_detection_settings():
+    """Latest detection settings, read at submit time
+
+    The privacy card runs as a fragment, so toggle changes update
+    ``st.session_state['privacy_settings']`` without re-executing the
+    main body -- the main-body snapshot in upload_detection_settings
+    can be a full toggle behind. Submissions read the fragment's mirror
+    directly so a job queued right after a toggle carries the
+    post-toggle settings.
+    """
+    return st.session_state.get(
+        'privacy_settings',
+        st.session_state.get('upload_detection_settings', DEFAULT_DETECTION_SETTINGS)
+    )
 
 def process_video_upload(filename: str, file_data: bytes):
     """Process uploaded video file"""
@@ -93,7 +107,7 @@ def process_video_upload(filename: str, file_data: bytes):
     try:
         # Get API client and detection settings
         api_client = get_api_client()
-        detection_settings = st.session_state.get('upload_detection_settings', {})
+        detection_settings = _current_detection_settings()
         
         # Create processing job
         job = create_video_processing_job(
@@ -122,8 +136,7 @@ def process_video_upload(filename: str, file_data: bytes):
         if "video_uploader" in st.session_state:
             del st.session_state.video_uploader
         
-        time.sleep(1)
-        st.experimental_rerun()
+        st.rerun()
         
     except Exception as e:
         st.error(f"❌ Processing failed: {str(e)}")
@@ -132,7 +145,22 @@ def render_processing_queue(job_manager):
     """Render the processing job queue"""
     
     st.markdown("### 📋 Processing Queue")
-    
+    _queue_fragment(job_manager)
+
+@st.fragment(run_every=2)
+def _queue_fragment(job_manager):
+    """Job queue body, refreshed on its own 2s cadence
+
+    Running as a fragment means only the queue redraws each tick; the
+    header, uploader and detection settings above it no longer re-render,
+    and no thread sits in time.sleep between reruns.
+    """
+
+    # Fragment ticks skip use_job_queue, so the shared clock stamp it
+    # sets would go stale here and walk ETAs backwards. Refreshing it
+    # once per tick keeps every job helper below on one clock read.
+    st.session_state['_rerun_now'] = time.time()
+
     # Get all jobs
     all_jobs = job_manager['get_all_jobs']()
     
@@ -146,13 +174,17 @@ def render_processing_queue(job_manager):
         """, unsafe_allow_html=True)
         return
     
-    # Sort jobs by creation time (newest first)
-    sorted_jobs = sorted(all_jobs, key=lambda j: j.created_at, reverse=True)
-    
-    # Tabs for different job statuses
-    active_jobs = [j for j in sorted_jobs if j.status == JobStatus.RUNNING]
-    completed_jobs = [j for j in sorted_jobs if j.status == JobStatus.COMPLETED]
-    failed_jobs = [j for j in sorted_jobs if j.status in [JobStatus.FAILED, JobStatus.CANCELLED]]
+    # The queue dict is insertion-ordered by submission time, so one
+    # reversed pass buckets jobs newest-first without the O(N log N)
+    # sort and three filter passes
+    active_jobs, completed_jobs, failed_jobs = [], [], []
+    for job in reversed(all_jobs):
+        if job.status == JobStatus.RUNNING:
+            active_jobs.append(job)
+        elif job.status == JobStatus.COMPLETED:
+            completed_jobs.append(job)
+        elif job.status in (JobStatus.FAILED, JobStatus.CANCELLED):
+            failed_jobs.append(job)
     
     tab1, tab2, tab3 = st.tabs([
         f"🔄 Active ({len(active_jobs)})",
@@ -182,23 +214,21 @@ def render_processing_queue(job_manager):
                 render_job_card(job, job_manager)
         else:
             st.info("No failed jobs")
-    
-    # Auto-refresh for active jobs
-    if active_jobs:
-        time.sleep(2)
-        st.experimental_rerun()
+
+# Status styling shared by every rendered job card
+_JOB_STATUS_COLOR = {
+    JobStatus.PENDING: "#6b7280",
+    JobStatus.RUNNING: "#f59e0b",
+    JobStatus.COMPLETED: "#10b981",
+    JobStatus.FAILED: "#ef4444",
+    JobStatus.CANCELLED: "#6b7280"
+}
 
 def render_job_card(job, job_manager):
     """Render individual job card"""
     
     # Job status styling
-    status_color = {
-        JobStatus.PENDING: "#6b7280",
-        JobStatus.RUNNING: "#f59e0b", 
-        JobStatus.COMPLETED: "#10b981",
-        JobStatus.FAILED: "#ef4444",
-        JobStatus.CANCELLED: "#6b7280"
-    }.get(job.status, "#6b7280")
+    status_color = _JOB_STATUS_COLOR.get(job.status, "#6b7280")
     
     status_emoji = get_status_emoji(job.status.value)
     
@@ -206,8 +236,10 @@ def render_job_card(job, job_manager):
     duration = job.get_duration()
     eta = job.get_eta_seconds()
     
-    # Job card HTML
-    st.markdown(f"""
+    # Job card HTML: accumulate every fragment and emit once — each
+    # st.markdown is a separate delta message to the frontend, so one
+    # payload per card instead of four or five
+    parts = [f"""
     <div style="background: #1f2937; border-radius: 12px; padding: 1.5rem; margin-bottom: 1rem; border-left: 4px solid {status_color};">
         <div style="display: flex; justify-content: space-between; align-items: start; margin-bottom: 1rem;">
             <div>
@@ -225,21 +257,22 @@ def render_job_card(job, job_manager):
                 </div>
             </div>
         </div>
-    """, unsafe_allow_html=True)
+    """]
     
     # Progress bar for running jobs
     if job.status == JobStatus.RUNNING:
-        progress_html = create_progress_bar_html(job.progress, "#f59e0b", "12px")
-        st.markdown(progress_html, unsafe_allow_html=True)
-        
-        col1, col2, col3 = st.columns([1, 1, 1])
-        with col1:
-            st.markdown(f"**Progress:** {job.progress:.1f}%")
-        with col2:
-            st.markdown(f"**Stage:** {job.current_stage or 'Processing'}")
-        with col3:
-            if eta:
-                st.markdown(f"**ETA:** {format_eta(eta)}")
+        parts.append(create_progress_bar_html(job.progress, "#f59e0b", "12px"))
+        eta_cell = f"<span><strong>ETA:</strong> {format_eta(eta)}</span>" if eta else "<span></span>"
+        parts.append(
+            f"""<div style="display: flex; justify-content: space-between; color: #d1d5db; margin-top: 0.5rem;">
+            <span><strong>Progress:</strong> {job.progress:.1f}%</span>
+            <span><strong>Stage:</strong> {job.current_stage or 'Processing'}</span>
+            {eta_cell}
+        </div>"""
+        )
+    
+    parts.append("</div>")
+    st.markdown("".join(parts), unsafe_allow_html=True)
     
     # Job details
     with st.expander(f"📊 Job Details - {job.id[:8]}"):
@@ -278,7 +311,7 @@ def render_job_card(job, job_manager):
         if job.status == JobStatus.RUNNING:
             if st.button(f"⏹️ Cancel", key=f"cancel_{job.id}"):
                 job_manager['cancel_job'](job.id)
-                st.experimental_rerun()
+                st.rerun()
     
     with col_actions[1]:
         if job.status == JobStatus.COMPLETED and job.output_data:
@@ -290,9 +323,7 @@ def render_job_card(job, job_manager):
             # Remove job from queue
             if job.id in job_manager['queue'].jobs:
                 del job_manager['queue'].jobs[job.id]
-            st.experimental_rerun()
-    
-    st.markdown("</div>", unsafe_allow_html=True)
+            st.rerun()
 
 def render_batch_upload():
     """Render batch upload functionality"""
@@ -314,11 +345,12 @@ def render_batch_upload():
         valid_files = []
         
         for file in uploaded_files:
-            file_data = file.read()
-            validation = validate_video_file(file_data, file.name)
+            validation = validate_video_stream(file, file.name)
             
             if validation['valid']:
-                valid_files.append((file.name, file_data))
+                # Keep the file-like object; nothing is read into memory
+                # until each file is actually submitted
+                valid_files.append(file)
                 total_size += validation['size']
             else:
                 st.warning(f"⚠️ {file.name}: {validation['error']}")
@@ -333,18 +365,19 @@ def process_batch_upload(files):
     """Process batch upload"""
     
     job_manager = use_job_queue()
-    detection_settings = st.session_state.get('upload_detection_settings', {})
+    detection_settings = _current_detection_settings()
     
-    for filename, file_data in files:
-        job = create_video_processing_job(
-            file_path=filename,
+    jobs = [
+        create_video_processing_job(
+            file_path=file.name,
             detection_settings=detection_settings
         )
-        job_manager['submit_job'](job)
+        for file in files
+    ]
+    job_manager['submit_jobs'](jobs)
     
     st.success(f"✅ {len(files)} files queued for processing!")
-    time.sleep(1)
-    st.experimental_rerun()
+    st.rerun()
 
 # Main page render function
 if __name__ == "__main__":
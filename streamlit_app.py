@@ -8,9 +8,14 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+import os
 import time
+import queue
 import subprocess
 import sys
+import threading
+import cv2
+import numpy as np
 from streamlit_webrtc import webrtc_streamer, VideoProcessorBase, RTCConfiguration
 import av
 
@@ -31,32 +36,329 @@ def install_requirements():
 
 install_requirements()
 
+# Detection toggle bits, mirroring the bitmask layout in
+# app/hooks/use_live.py; _FLAG_SETTINGS pre-expands every mask into the
+# dict form the processor consumes, so the worker pays one int read and
+# one dict lookup per frame instead of rebuilding dicts
+_LICENSE_PLATES = 1
+_STREET_SIGNS = 2
+_BLOCK_NUMBERS = 4
+
+_FLAG_SETTINGS = {
+    mask: {
+        'license_plates': bool(mask & _LICENSE_PLATES),
+        'street_signs': bool(mask & _STREET_SIGNS),
+        'block_numbers': bool(mask & _BLOCK_NUMBERS),
+    }
+    for mask in range(8)
+}
+
+def _plane_view(frame):
+    """Zero-copy ndarray view of a frame that is already packed bgr24
+
+    to_ndarray always routes through libswscale and returns a fresh
+    allocation even when no conversion is needed. For bgr24 sources the
+    plane buffer is viewed directly (honoring line_size padding) and
+    marked read-only; process_frame copies before mutating, so the
+    shared memory is never written. Anything else falls back to the
+    converting path.
+    """
+    if frame.format.name == 'bgr24':
+        plane = frame.planes[0]
+        view = np.frombuffer(plane, np.uint8)
+        if plane.line_size == frame.width * 3:
+            view = view.reshape(frame.height, frame.width, 3)
+        else:
+            view = view.reshape(frame.height, plane.line_size)[
+                :, :frame.width * 3
+            ].reshape(frame.height, frame.width, 3)
+        view.flags.writeable = False
+        return view
+    return frame.to_ndarray(format="bgr24")
+
 class StreamSafeVideoProcessor(VideoProcessorBase):
-    """Streamlit WebRTC video processor"""
-    
+    """Streamlit WebRTC video processor
+
+    The CV work runs on a dedicated worker thread fed through a pair of
+    single-slot queues with drop-oldest semantics: ``recv`` never blocks
+    the WebRTC asyncio loop on a colorspace convert or a model call, and
+    when processing falls behind the viewer sees the newest processed
+    frame instead of an ever-growing delay.
+
+    Toggle state lives in ``flags``, a small int bitfield: per-frame
+    guards are a single AND instead of dict lookups, and int reads and
+    writes are atomic under the GIL so the Streamlit thread can flip
+    settings without a lock.
+
+    NOTE: sharing the toggles as a np.uint8 array between the Streamlit
+    thread and this worker was considered and rejected: the int
+    bitfield already gives single-store writes and lock-free reads, the
+    Numba kernels receive boxes rather than toggle state, and a shared
+    ndarray would outlive reruns only by stashing it in session state,
+    which re-executes per connection anyway.
+    """
+
+    __slots__ = ('processor', 'flags', '_in_q', '_out_q', '_worker_thread',
+                 '_last_hash', '_hash_hits', '_hash_total',
+                 '_pool', '_pool_idx', '_last_out')
+
     def __init__(self):
         self.processor = StreamSafeProcessor()
-        self.detection_enabled = {
-            'license_plates': False,
-            'street_signs': False,
-            'block_numbers': False
-        }
-    
+        self.flags = 0
+        self._in_q = queue.Queue(maxsize=1)
+        self._out_q = queue.Queue(maxsize=1)
+        # Most recent worker output, repeated when the worker lags so
+        # raw frames never reach the peer while protections are on
+        self._last_out = None
+        # dHash temporal-reuse state: near-duplicate frames skip the
+        # detection submission and keep the previous boxes
+        self._last_hash = None
+        self._hash_hits = 0
+        self._hash_total = 0
+        # Rotating pool of output frames, allocated lazily once the
+        # stream dimensions are known
+        self._pool = None
+        self._pool_idx = 0
+        self._worker_thread = threading.Thread(target=self._worker, daemon=True)
+        self._worker_thread.start()
+
     def update_detection_settings(self, settings):
         """Update detection settings from Streamlit session state"""
-        self.detection_enabled = settings.copy()
-    
+        self.flags = (
+            (_LICENSE_PLATES if settings.get('license_plates') else 0)
+            | (_STREET_SIGNS if settings.get('street_signs') else 0)
+            | (_BLOCK_NUMBERS if settings.get('block_numbers') else 0)
+        )
+
+    def _pooled_bgr_frame(self, img, src):
+        """Copy ``img`` into a rotating pool of bgr24 output frames
+
+        from_ndarray allocates a fresh frame and backing planes per
+        call, which at streaming rates is constant multi-MB/s allocator
+        churn. A three-deep pool is recycled instead: the out queue
+        holds at most one frame and the track consumes it before the
+        slot comes around again, so a slot is never overwritten while
+        still in flight.
+        """
+        if (self._pool is None
+                or self._pool[0].width != src.width
+                or self._pool[0].height != src.height):
+            self._pool = [
+                av.VideoFrame(src.width, src.height, 'bgr24')
+                for _ in range(3)
+            ]
+        vf = self._pool[self._pool_idx]
+        self._pool_idx = (self._pool_idx + 1) % len(self._pool)
+
+        plane = vf.planes[0]
+        dst = np.frombuffer(plane, np.uint8).reshape(
+            src.height, plane.line_size
+        )
+        # Row-wise copy honors the plane's alignment padding
+        dst[:, :src.width * 3] = img.reshape(src.height, src.width * 3)
+        vf.pts = src.pts
+        vf.time_base = src.time_base
+        return vf
+
+    def _should_detect(self, gray_small):
+        """Difference-hash gate over a tiny grayscale thumbnail
+
+        Consecutive webcam frames are highly correlated; an 8x8 dHash
+        costs microseconds, and when the Hamming distance to the
+        previous frame is under 5 bits the cached detections are reused
+        instead of queueing another detector pass.
+        """
+        bits = np.packbits(gray_small[:, :-1] > gray_small[:, 1:])
+        self._hash_total += 1
+        last = self._last_hash
+        self._last_hash = bits
+        if last is not None:
+            if int(np.unpackbits(bits ^ last).sum()) < 5:
+                self._hash_hits += 1
+                return False
+        return True
+
+    @property
+    def cache_hit_rate(self):
+        """Fraction of frames that reused the previous detections"""
+        return self._hash_hits / self._hash_total if self._hash_total else 0.0
+
+    @staticmethod
+    def _put_latest(q, item):
+        """put_nowait with drop-oldest semantics on a full queue"""
+        try:
+            q.put_nowait(item)
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                q.put_nowait(item)
+            except queue.Full:
+                pass
+
+    def _worker(self):
+        """Convert, process and rebuild frames off the asyncio loop"""
+        # Best-effort: pin this thread away from the cores servicing
+        # the asyncio loop (Linux only; containers may deny it)
+        try:
+            cores = sorted(os.sched_getaffinity(0))
+            if len(cores) > 2:
+                os.sched_setaffinity(0, set(cores[-2:]))
+        except (AttributeError, OSError):
+            pass
+        while True:
+            frame = self._in_q.get()
+            if frame is None:
+                break
+            try:
+                flags = self.flags
+                if not flags:
+                    # Nothing enabled: skip both colorspace conversions
+                    out = frame
+                elif (frame.format.name in ('yuv420p', 'yuvj420p')
+                        and not flags & _STREET_SIGNS):
+                    # Stay in the browser's native format and let the
+                    # processor work from the luma plane: no BGR round
+                    # trip, 3x fewer bytes through the pipeline
+                    yuv = frame.to_ndarray()
+                    # The display path must stay uint8 end to end: one
+                    # stray float32 cast quadruples the bytes moved per
+                    # frame. Model input normalization happens only on
+                    # the small detection tensor, never the full frame.
+                    assert yuv.dtype == np.uint8
+                    luma = yuv[:(yuv.shape[0] * 2) // 3]
+                    detect = self._should_detect(
+                        cv2.resize(luma, (9, 8), interpolation=cv2.INTER_AREA)
+                    )
+                    processed = self.processor.process_frame_yuv420(
+                        yuv, _FLAG_SETTINGS[flags], detect=detect
+                    )
+                    if processed is yuv:
+                        out = frame
+                    else:
+                        out = av.VideoFrame.from_ndarray(
+                            processed, format=frame.format.name
+                        )
+                        out.pts = frame.pts
+                        out.time_base = frame.time_base
+                else:
+                    img = _plane_view(frame)
+                    assert img.dtype == np.uint8
+                    detect = self._should_detect(cv2.cvtColor(
+                        cv2.resize(img, (9, 8), interpolation=cv2.INTER_AREA),
+                        cv2.COLOR_BGR2GRAY
+                    ))
+                    processed = self.processor.process_frame(
+                        img, _FLAG_SETTINGS[flags], detect=detect
+                    )
+                    if processed is img:
+                        # Nothing was blurred; forward the original frame
+                        out = frame
+                    else:
+                        out = self._pooled_bgr_frame(processed, frame)
+            except Exception:
+                out = frame
+            self._put_latest(self._out_q, out)
+
     def recv(self, frame):
-        """Process each frame with privacy protections"""
-        img = frame.to_ndarray(format="bgr24")
-        processed_img = self.processor.process_frame(img, self.detection_enabled)
-        return av.VideoFrame.from_ndarray(processed_img, format="bgr24")
+        """Hand the frame to the worker without blocking the event loop"""
+        if not self.flags:
+            # Zero-cost passthrough: no queue hop, no conversion, and
+            # the original pts/time_base are preserved exactly
+            return frame
+        self._put_latest(self._in_q, frame)
+        try:
+            out = self._out_q.get_nowait()
+            self._last_out = out
+            return out
+        except queue.Empty:
+            # Never leak an unprocessed frame while protections are on:
+            # repeat the last worker output until it catches up. Raw
+            # passthrough only happens before the first output exists.
+            return self._last_out if self._last_out is not None else frame
+
+# Static schema for the privacy detection controls; the row HTML is
+# rendered once at import since only the toggle state varies per rerun
+_DETECTION_OPTIONS = (
+    {
+        'key': 'license_plates',
+        'icon': '🚗',
+        'title': 'License Plates',
+        'description': 'YOLO-based vehicle license plate detection'
+    },
+    {
+        'key': 'street_signs',
+        'icon': '📍',
+        'title': 'Street Signs',
+        'description': 'Singapore street sign detection'
+    },
+    {
+        'key': 'block_numbers',
+        'icon': '🏠',
+        'title': 'Block Numbers',
+        'description': 'EasyOCR Singapore block number detection'
+    }
+)
+
+_OPTION_ROW_HTML = {
+    option['key']: """
+            <div style="display: flex; align-items: center; gap: 1rem;">
+                <span style="font-size: 1.2rem;">{icon}</span>
+                <div>
+                    <div style="color: white; font-weight: 600; margin: 0;">{title}</div>
+                    <div style="color: #9ca3af; font-size: 0.85rem; margin: 0;">{description}</div>
+                </div>
+            </div>
+            """.format_map(option)
+    for option in _DETECTION_OPTIONS
+}
+
+# Pre-rendered sidebar status blocks: one markdown payload replaces a
+# success/info banner plus a metric widget (each its own protocol
+# message) per rerun
+_SIDEBAR_STATUS_HTML = {
+    True: """
+<div style="background: rgba(16, 185, 129, 0.1); border: 1px solid #10b981; border-radius: 8px; padding: 0.75rem 1rem; color: #10b981;">
+    🟢 Stream Active<br>
+    <span style="font-size: 1.5rem; font-weight: 600;">Camera: Live</span>
+</div>
+""",
+    False: """
+<div style="background: rgba(107, 114, 128, 0.1); border: 1px solid #6b7280; border-radius: 8px; padding: 0.75rem 1rem; color: #9ca3af;">
+    ⚫ Stream Inactive<br>
+    <span style="font-size: 1.5rem; font-weight: 600;">Camera: Offline</span>
+</div>
+""",
+}
+
+_PROTECTION_LABELS = {
+    'license_plates': "🚗 License Plates (YOLO)",
+    'street_signs': "📍 Street Signs (HSV)",
+    'block_numbers': "🏠 Block Numbers (OCR)",
+}
+
+# Long-side pixel targets for the detection working copy; inference
+# cost scales with the square of this, so the default stays low
+_DETECTION_SIZES = {
+    "Fast (416px)": 416,
+    "Balanced (640px)": 640,
+    "Quality (960px)": 960,
+}
 
 @st.cache_resource
 def get_processor():
     """Create global processor instance"""
     return StreamSafeVideoProcessor()
 
+@st.cache_resource
+def get_rtc_configuration():
+    """Build the WebRTC ICE configuration once per session"""
+    return RTCConfiguration(
+        {"iceServers": [{"urls": ["stun:stun.l.google.com:19302"]}]}
+    )
+
 class LiveStreamState:
     """Mock live stream state"""
     def __init__(self):
@@ -68,9 +370,9 @@ class LiveStreamState:
     def start_stream(self):
         self.is_streaming = True
 
-def load_css():
-    """Load custom CSS styling"""
-    st.markdown("""
+# The stylesheet is a module constant built once at import, so each
+# run pays one markdown message instead of rebuilding the string
+_APP_CSS = """
     <style>
     .stApp {
         background-color: #0a0a0a;
@@ -132,7 +434,95 @@ def load_css():
     footer {visibility: hidden;}
     header {visibility: hidden;}
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+def load_css():
+    """Inject the custom CSS
+
+    Emitted every run: Streamlit drops elements that are not re-emitted
+    during a script run, so a once-per-session gate would wipe the
+    theme on the first full rerun.
+    """
+    st.markdown(_APP_CSS, unsafe_allow_html=True)
+
+def _on_resolution_change():
+    """Push the new detection size straight into the running processor
+
+    Runs as a widget callback, so the video pipeline reconfigures
+    without waiting for (or triggering) a main-body rerun.
+    """
+    get_processor().processor.detection_size = _DETECTION_SIZES[
+        st.session_state.detection_resolution
+    ]
+
+@st.fragment
+def _render_sidebar(webrtc_playing):
+    """Render the status sidebar
+
+    Runs as a fragment so sidebar interactions (resolution changes,
+    reset clicks) redraw only this block instead of re-executing the
+    whole page script.
+    """
+    processor = get_processor()
+
+    st.header("📊 Stream Status")
+
+    st.markdown(
+        _SIDEBAR_STATUS_HTML[bool(webrtc_playing)],
+        unsafe_allow_html=True
+    )
+
+    active_protections = [
+        label
+        for key, label in _PROTECTION_LABELS.items()
+        if st.session_state.detection_settings[key]
+    ]
+
+    # Each sidebar block is a single markdown payload instead of one
+    # message per line
+    if active_protections:
+        protection_lines = "  \n".join(
+            f"✅ {protection}" for protection in active_protections
+        )
+        summary = f"🔥 {len(active_protections)} AI protection(s) active!"
+    else:
+        protection_lines = "⚪ No protections active"
+        summary = "Toggle features above to enable AI privacy protection"
+
+    st.markdown(
+        "---\n### 🛡️ Active Protections\n"
+        f"{protection_lines}\n\n{summary}"
+    )
+
+    st.markdown(
+        "---\n### 🔧 Performance Info\n"
+        "**🎯 Detection Rates:**  \n"
+        "• License Plates: Real-time  \n"
+        "• Street Signs: Every 15 frames  \n"
+        "• Block Numbers: Every 30 frames  \n"
+        f"• Frame cache hit rate: {processor.cache_hit_rate:.0%}"
+    )
+
+    st.selectbox(
+        "🎚️ Detection Resolution",
+        options=list(_DETECTION_SIZES),
+        index=0,
+        key="detection_resolution",
+        on_change=_on_resolution_change,
+        help="Higher resolutions catch smaller text and plates but cost quadratically more per detection pass"
+    )
+
+    if st.button("🔄 Reset All Settings", help="Turn off all privacy protections"):
+        # Mutate state in place; the stream reacts immediately via the
+        # processor and the form re-reads the values on its next run
+        st.session_state.detection_settings.update({
+            'license_plates': False,
+            'street_signs': False,
+            'block_numbers': False
+        })
+        processor.update_detection_settings(st.session_state.detection_settings)
+        for option in _DETECTION_OPTIONS:
+            st.session_state.pop(f"toggle_{option['key']}", None)
 
 def main():
     """Main Streamlit application"""
@@ -151,7 +541,8 @@ def main():
     
     processor = get_processor()
     
-    # Header
+    # Header and stream-section opener in one markdown call: each
+    # st.markdown is a separate protocol message to the frontend
     st.markdown("""
     <div class="main-header">
         <div class="logo-section">
@@ -166,10 +557,6 @@ def main():
             <span>Ready</span>
         </div>
     </div>
-    """, unsafe_allow_html=True)
-    
-    # Video Stream Section - Using columns to center and control size
-    st.markdown("""
     <div class="video-container">
         <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;">
             <h3 style="margin: 0; color: white;">🔴 Live Privacy-Protected Stream</h3>
@@ -188,7 +575,7 @@ def main():
         webrtc_ctx = webrtc_streamer(
             key="privacy_protected_feed",
             video_processor_factory=lambda: processor,
-            rtc_configuration=RTCConfiguration({"iceServers": [{"urls": ["stun:stun.l.google.com:19302"]}]}),
+            rtc_configuration=get_rtc_configuration(),
             media_stream_constraints={
                 "video": {
                     "width": {"ideal": 640, "max": 640},
@@ -227,56 +614,31 @@ def main():
         </div>
     """, unsafe_allow_html=True)
     
-    # Detection options
-    detection_options = [
-        {
-            'key': 'license_plates',
-            'icon': '🚗',
-            'title': 'License Plates',
-            'description': 'YOLO-based vehicle license plate detection'
-        },
-        {
-            'key': 'street_signs',
-            'icon': '📍',
-            'title': 'Street Signs',
-            'description': 'Singapore street sign detection'
-        },
-        {
-            'key': 'block_numbers',
-            'icon': '🏠',
-            'title': 'Block Numbers',
-            'description': 'EasyOCR Singapore block number detection'
-        }
-    ]
-    
-    for option in detection_options:
-        col_info, col_toggle = st.columns([3, 1])
-        
-        with col_info:
-            st.markdown(f"""
-            <div style="display: flex; align-items: center; gap: 1rem;">
-                <span style="font-size: 1.2rem;">{option['icon']}</span>
-                <div>
-                    <div style="color: white; font-weight: 600; margin: 0;">{option['title']}</div>
-                    <div style="color: #9ca3af; font-size: 0.85rem; margin: 0;">{option['description']}</div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col_toggle:
-            new_value = st.toggle(
-                "",
-                value=st.session_state.detection_settings[option['key']],
-                key=f"toggle_{option['key']}",
-                label_visibility="collapsed"
-            )
-            
-            if new_value != st.session_state.detection_settings[option['key']]:
-                st.session_state.detection_settings[option['key']] = new_value
-                processor.update_detection_settings(st.session_state.detection_settings)
-                
-                status = "enabled" if new_value else "disabled"
-                st.toast(f"🛡️ {option['title']} {status}", icon="✅" if new_value else "⚪")
+    # All toggles submit atomically through one form, so changing
+    # several settings costs a single rerun instead of one per toggle
+    with st.form("detection", clear_on_submit=False):
+        new_settings = {}
+        for option in _DETECTION_OPTIONS:
+            col_info, col_toggle = st.columns([3, 1])
+
+            with col_info:
+                st.markdown(_OPTION_ROW_HTML[option['key']], unsafe_allow_html=True)
+
+            with col_toggle:
+                new_settings[option['key']] = st.toggle(
+                    "",
+                    value=st.session_state.detection_settings[option['key']],
+                    key=f"toggle_{option['key']}",
+                    label_visibility="collapsed"
+                )
+
+        applied = st.form_submit_button("✅ Apply Protection Settings")
+
+    if applied and new_settings != st.session_state.detection_settings:
+        st.session_state.detection_settings = new_settings
+        processor.update_detection_settings(new_settings)
+        active = sum(new_settings.values())
+        st.toast(f"🛡️ {active} protection(s) active", icon="✅" if active else "⚪")
     
     st.markdown("""
     <div style="text-align: center; color: #6b7280; margin-top: 1.5rem; font-size: 0.85rem;">
@@ -318,49 +680,7 @@ def main():
     
     # Sidebar
     with st.sidebar:
-        st.header("📊 Stream Status")
-        
-        if webrtc_ctx.state.playing:
-            st.success("🟢 Stream Active")
-            st.metric("Camera", "Live")
-        else:
-            st.info("⚫ Stream Inactive")  
-            st.metric("Camera", "Offline")
-        
-        st.markdown("---")
-        st.markdown("### 🛡️ Active Protections")
-        
-        active_protections = []
-        if st.session_state.detection_settings['license_plates']:
-            active_protections.append("🚗 License Plates (YOLO)")
-        if st.session_state.detection_settings['street_signs']:
-            active_protections.append("📍 Street Signs (HSV)")
-        if st.session_state.detection_settings['block_numbers']:
-            active_protections.append("🏠 Block Numbers (OCR)")
-        
-        if active_protections:
-            for protection in active_protections:
-                st.write(f"✅ {protection}")
-            st.info(f"🔥 {len(active_protections)} AI protection(s) active!")
-        else:
-            st.write("⚪ No protections active")
-            st.info("Toggle features above to enable AI privacy protection")
-        
-        st.markdown("---")
-        st.markdown("### 🔧 Performance Info")
-        st.write("**🎯 Detection Rates:**")
-        st.write("• License Plates: Real-time")
-        st.write("• Street Signs: Every 15 frames")  
-        st.write("• Block Numbers: Every 30 frames")
-        
-        if st.button("🔄 Reset All Settings", help="Turn off all privacy protections"):
-            st.session_state.detection_settings = {
-                'license_plates': False,
-                'street_signs': False,
-                'block_numbers': False
-            }
-            processor.update_detection_settings(st.session_state.detection_settings)
-            st.rerun()
+        _render_sidebar(webrtc_ctx.state.playing)
 
 if __name__ == "__main__":
     main()